@@ -0,0 +1,66 @@
+"""
+Shared helpers for the start_api / start_streamlit launch scripts.
+
+Dependency probing, child spawning, readiness waits and the browser
+opener were duplicated in both entry points; keeping them here means one
+module (and one .pyc) regardless of which script is run.
+"""
+import importlib.util
+import socket
+import subprocess
+import time
+import webbrowser
+
+def _port_open(port, timeout=0.2):
+    """One TCP connect attempt against a local port."""
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout):
+            return True
+    except OSError:
+        return False
+
+def probe_deps(packages):
+    """Return the subset of packages whose import spec cannot be found.
+
+    find_spec is a metadata lookup, far cheaper than importing a package
+    just to see whether it exists.
+    """
+    return [p for p in packages if importlib.util.find_spec(p) is None]
+
+def spawn_child(argv, capture=False):
+    """Spawn a detached child process.
+
+    start_new_session detaches the child (Ctrl+C in the foreground
+    doesn't kill it) and keeps CPython on the posix_spawn fast path
+    instead of fork+exec duplicating the parent's address space. With
+    capture=True the child's stdout+stderr are piped back for readiness
+    watching; otherwise they go to /dev/null.
+    """
+    out = subprocess.PIPE if capture else subprocess.DEVNULL
+    err = subprocess.STDOUT if capture else subprocess.DEVNULL
+    return subprocess.Popen(argv, stdout=out, stderr=err, bufsize=0,
+                            start_new_session=True, close_fds=True)
+
+def wait_ready(port, timeout=15.0):
+    """Wait until a local port accepts connections.
+
+    Always makes at least one probe; retries back off from 50ms to 1s so
+    a typical sub-second startup is caught within a probe or two.
+    """
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    while True:
+        if _port_open(port):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 1.7, 1.0)
+
+def open_browser(url, port, timeout=30.0):
+    """Open url as soon as the given local port accepts connections."""
+    wait_ready(port, timeout)
+    try:
+        webbrowser.open(url)
+    except Exception:
+        pass  # Browser opening is optional
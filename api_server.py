@@ -5,29 +5,43 @@ Provides REST API endpoints for all document processing and querying functionali
 
 import asyncio
 import logging
+import os
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import uvicorn
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 import tempfile
 import shutil
+import aiofiles
 
 from query_interface import QueryInterface
 from rag_manager import RAGManager
-from config import Config
+from semantic_cache import SemanticCache
+from task_queue import get_task_pool
+from config import Config, get_config
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Production deployments disable the interactive docs: Swagger UI pulls
+# large JS bundles and the schema endpoints add avoidable surface
+_PRODUCTION = os.getenv("RAG_PRODUCTION", "").lower() in ("1", "true", "yes")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="RAG-Anything API",
     description="REST API for multimodal document processing and querying",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,  # SIMD JSON for large /status payloads
+    docs_url=None if _PRODUCTION else "/docs",
+    redoc_url=None if _PRODUCTION else "/redoc",
+    openapi_url=None if _PRODUCTION else "/openapi.json"
 )
 
 # Add CORS middleware
@@ -37,11 +51,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,  # let browsers cache preflight responses for 24h
 )
 
+# Compress larger JSON responses (document lists compress 10-20x)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# File types accepted by /upload (bare suffixes, lowercase)
+_ALLOWED_EXTENSIONS = frozenset({'pdf', 'docx', 'doc', 'pptx', 'ppt', 'txt', 'md'})
+
 # Global interface instance
 query_interface: Optional[QueryInterface] = None
 
+# Semantic query-response cache (answers for paraphrased repeat questions)
+semantic_cache: Optional[SemanticCache] = None
+
+# External task queue pool (None means fall back to BackgroundTasks)
+task_pool = None
+
+async def _enqueue_processing(background_tasks: BackgroundTasks,
+                              file_path: str,
+                              force_reprocess: bool) -> Optional[str]:
+    """Queue a document for processing.
+
+    Uses the external arq/Redis queue when configured so parsing never
+    blocks the API worker; otherwise falls back to in-process
+    BackgroundTasks. Returns the job id when queued externally.
+    """
+    if task_pool is not None:
+        job = await task_pool.enqueue_job('process_document_task', file_path, force_reprocess)
+        return job.job_id
+
+    background_tasks.add_task(_process_document_background, file_path, force_reprocess)
+    return None
+
 # Pydantic models for request/response
 class QueryRequest(BaseModel):
     question: str
@@ -89,20 +132,39 @@ class StatusResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize the query interface on startup."""
-    global query_interface
+    global query_interface, semantic_cache, task_pool
     try:
         logger.info("Initializing RAG-Anything API...")
-        query_interface = QueryInterface()
-        await query_interface.initialize(use_existing=True)
+        if query_interface is None:
+            query_interface = QueryInterface()
+            # Query mode: ingest setup is deferred until the first
+            # /upload or /process call actually needs it
+            await query_interface.initialize(use_existing=True, mode="query")
+        else:
+            logger.info("Using pre-initialized QueryInterface (preload mode)")
+        # ask() checks this cache itself; the API only needs it for shutdown persistence
+        semantic_cache = query_interface.semantic_cache
+        task_pool = await get_task_pool()
         logger.info("✅ RAG-Anything API initialized successfully")
     except Exception as e:
-        logger.error(f"❌ Failed to initialize API: {e}")
+        logger.error("❌ Failed to initialize API: %s", e)
         raise
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down RAG-Anything API...")
+    if semantic_cache is not None:
+        semantic_cache.save()
+    if query_interface is not None and query_interface.rag_manager is not None:
+        await query_interface.rag_manager.aclose()
+
+# Liveness probe: static 200 that never touches RAG state, cheap
+# enough for launch scripts to poll aggressively
+@app.get("/healthz")
+async def liveness_check():
+    """Liveness probe for launch scripts."""
+    return {"status": "ok"}
 
 # Health check endpoint
 @app.get("/health")
@@ -121,16 +183,20 @@ async def query_documents(request: QueryRequest):
         raise HTTPException(status_code=503, detail="Service not initialized")
     
     try:
-        logger.info(f"Processing query: {request.question[:100]}...")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Processing query: %s...", request.question[:100])
+
+        # ask() consults the shared semantic cache before hitting the
+        # retrieval + LLM pipeline
         answer = await query_interface.ask(request.question, mode=request.mode)
-        
+
         return QueryResponse(
             answer=answer,
             mode=request.mode,
             success=True
         )
     except Exception as e:
-        logger.error(f"Query failed: {e}")
+        logger.error("Query failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
 
 @app.get("/query/{question}")
@@ -152,19 +218,23 @@ async def process_document(request: ProcessRequest, background_tasks: Background
     
     try:
         # Process in background for large files
-        background_tasks.add_task(
-            _process_document_background,
+        job_id = await _enqueue_processing(
+            background_tasks,
             str(file_path),
             request.force_reprocess
         )
-        
+
+        message = f"Document processing started for {file_path.name}"
+        if job_id:
+            message += f" (job {job_id})"
+
         return ProcessResponse(
             success=True,
-            message=f"Document processing started for {file_path.name}",
+            message=message,
             file_path=str(file_path)
         )
     except Exception as e:
-        logger.error(f"Process request failed: {e}")
+        logger.error("Process request failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
 @app.post("/upload")
@@ -177,43 +247,47 @@ async def upload_and_process(
     if query_interface is None:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    # Validate file type
-    allowed_extensions = {'.pdf', '.docx', '.doc', '.pptx', '.ppt', '.txt', '.md'}
-    file_extension = Path(file.filename).suffix.lower()
-    
-    if file_extension not in allowed_extensions:
+    # Validate file type (rpartition avoids PurePath construction per
+    # request; an empty separator means no dot at all — reject those
+    # rather than treating the whole name as an extension)
+    _, dot, file_extension = file.filename.rpartition('.')
+    file_extension = file_extension.lower()
+
+    if not dot or file_extension not in _ALLOWED_EXTENSIONS:
         raise HTTPException(
-            status_code=400, 
-            detail=f"Unsupported file type: {file_extension}. Allowed: {allowed_extensions}"
+            status_code=400,
+            detail=f"Unsupported file type: .{file_extension}. Allowed: {sorted(_ALLOWED_EXTENSIONS)}"
         )
     
     # Save uploaded file to pending directory
-    config = Config()
-    config.validate_config()
+    config = get_config()
     
     try:
         pending_file = config.PENDING_DIR / file.filename
         
-        # Save uploaded content
-        with open(pending_file, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream uploaded content to disk in 1 MiB chunks so the event
+        # loop isn't blocked for the duration of a large upload
+        async with aiofiles.open(pending_file, "wb") as buffer:
+            while chunk := await file.read(1 << 20):
+                await buffer.write(chunk)
         
         # Process the document
-        background_tasks.add_task(
-            _process_document_background,
+        job_id = await _enqueue_processing(
+            background_tasks,
             str(pending_file),
             force_reprocess
         )
-        
+
         return {
             "success": True,
             "message": f"File uploaded and processing started: {file.filename}",
             "filename": file.filename,
-            "file_path": str(pending_file)
+            "file_path": str(pending_file),
+            "job_id": job_id
         }
         
     except Exception as e:
-        logger.error(f"Upload failed: {e}")
+        logger.error("Upload failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 @app.post("/process/pending")
@@ -230,9 +304,51 @@ async def process_all_pending(background_tasks: BackgroundTasks):
             "message": "Processing all pending documents started"
         }
     except Exception as e:
-        logger.error(f"Batch processing failed: {e}")
+        logger.error("Batch processing failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Batch processing failed: {str(e)}")
 
+# Filesystem scans are slow (a stat per processed file) but their results
+# change rarely, so /documents and /status share a short TTL cache and run
+# the walk on the threadpool instead of the event loop.
+_SCAN_CACHE_TTL = 5.0
+_docs_info_cache = (0.0, None)
+_status_cache = (0.0, None)
+
+async def _get_documents_info_cached() -> Dict[str, Any]:
+    """Get detailed documents info, cached for a few seconds."""
+    global _docs_info_cache
+    ts, value = _docs_info_cache
+    if value is not None and time.monotonic() - ts < _SCAN_CACHE_TTL:
+        return value
+    value = await asyncio.to_thread(query_interface._get_detailed_documents_info)
+    _docs_info_cache = (time.monotonic(), value)
+    return value
+
+async def _get_status_cached() -> Dict[str, Any]:
+    """Get rag_manager status, cached for a few seconds."""
+    global _status_cache
+    ts, value = _status_cache
+    if value is not None and time.monotonic() - ts < _SCAN_CACHE_TTL:
+        return value
+    value = await asyncio.to_thread(query_interface.rag_manager.get_status)
+    _status_cache = (time.monotonic(), value)
+    return value
+
+@app.get("/tasks/{job_id}")
+async def get_task_status(job_id: str):
+    """Get the status of an externally queued processing job."""
+    if task_pool is None:
+        raise HTTPException(status_code=404, detail="Task queue not configured")
+
+    try:
+        from arq.jobs import Job
+        job = Job(job_id, task_pool)
+        status = await job.status()
+        return {"job_id": job_id, "status": str(status)}
+    except Exception as e:
+        logger.error("Task status lookup failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to get task status: {str(e)}")
+
 # Document management endpoints
 @app.get("/documents", response_model=List[DocumentInfo])
 async def list_documents():
@@ -241,8 +357,8 @@ async def list_documents():
         raise HTTPException(status_code=503, detail="Service not initialized")
     
     try:
-        docs_info = query_interface._get_detailed_documents_info()
-        
+        docs_info = await _get_documents_info_cached()
+
         documents = []
         for doc_name, info in docs_info.items():
             documents.append(DocumentInfo(
@@ -256,7 +372,7 @@ async def list_documents():
         
         return documents
     except Exception as e:
-        logger.error(f"List documents failed: {e}")
+        logger.error("List documents failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to list documents: {str(e)}")
 
 @app.delete("/documents/{document_name}")
@@ -280,7 +396,7 @@ async def remove_document(document_name: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Remove document failed: {e}")
+        logger.error("Remove document failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to remove document: {str(e)}")
 
 @app.delete("/documents")
@@ -302,7 +418,7 @@ async def remove_all_documents():
             raise HTTPException(status_code=500, detail="Failed to remove all documents")
             
     except Exception as e:
-        logger.error(f"Remove all documents failed: {e}")
+        logger.error("Remove all documents failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to remove all documents: {str(e)}")
 
 # Status and information endpoints
@@ -313,8 +429,8 @@ async def get_status():
         raise HTTPException(status_code=503, detail="Service not initialized")
     
     try:
-        status = query_interface.rag_manager.get_status()
-        docs_info = query_interface._get_detailed_documents_info()
+        status = await _get_status_cached()
+        docs_info = await _get_documents_info_cached()
         
         documents = []
         for doc_name, info in docs_info.items():
@@ -335,7 +451,7 @@ async def get_status():
             documents=documents
         )
     except Exception as e:
-        logger.error(f"Get status failed: {e}")
+        logger.error("Get status failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get status: {str(e)}")
 
 @app.get("/")
@@ -364,43 +480,76 @@ async def root():
 async def _process_document_background(file_path: str, force_reprocess: bool):
     """Background task for document processing."""
     try:
-        logger.info(f"Background processing: {file_path}")
+        logger.info("Background processing: %s", file_path)
         success = await query_interface.add_document(file_path, force_reprocess)
         if success:
-            logger.info(f"✅ Successfully processed: {file_path}")
+            logger.info("✅ Successfully processed: %s", file_path)
         else:
-            logger.error(f"❌ Failed to process: {file_path}")
+            logger.error("❌ Failed to process: %s", file_path)
     except Exception as e:
-        logger.error(f"Background processing error: {e}")
+        logger.error("Background processing error: %s", e)
 
 async def _process_all_pending_background():
     """Background task for processing all pending documents."""
     try:
         logger.info("Background processing: all pending documents")
-        results = await query_interface.process_all_pending()
-        logger.info(f"✅ Batch processing complete: {results}")
+        pending_files = [f for f in Config.PENDING_DIR.glob("*") if f.is_file()]
+        if not pending_files:
+            logger.info("No pending documents found")
+            return
+
+        # Processing is I/O-bound on LLM calls, so run up to MAX_WORKERS
+        # documents concurrently; the semaphore also bounds API rate.
+        semaphore = asyncio.Semaphore(Config.MAX_WORKERS)
+
+        async def process_one(file_path):
+            async with semaphore:
+                return await query_interface.add_document(str(file_path))
+
+        results = await asyncio.gather(
+            *(process_one(f) for f in pending_files),
+            return_exceptions=True
+        )
+        processed = sum(1 for r in results if r is True)
+        logger.info("✅ Batch processing complete: %d/%d processed", processed, len(pending_files))
     except Exception as e:
-        logger.error(f"Background batch processing error: {e}")
+        logger.error("Background batch processing error: %s", e)
+
+# Optional pre-initialization for gunicorn --preload deployments:
+#   RAG_PRELOAD=1 gunicorn -k uvicorn.workers.UvicornWorker --preload -w N api_server:app
+# The heavy read-only LightRAG state is then built once in the master
+# process and copy-on-write shared across forked workers instead of being
+# duplicated per worker.
+if os.getenv("RAG_PRELOAD") == "1":
+    query_interface = QueryInterface()
+    asyncio.run(query_interface.initialize(use_existing=True, mode="query"))
 
 # Run the server
 if __name__ == "__main__":
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="RAG-Anything API Server")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
+    parser.add_argument("--workers", type=int, default=(os.cpu_count() or 1) * 2 + 1,
+                        help="Number of worker processes")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development")
-    
+
     args = parser.parse_args()
-    
+
     print("🚀 Starting RAG-Anything API Server...")
     print(f"📡 Server will be available at: http://{args.host}:{args.port}")
     print(f"📚 Interactive docs at: http://{args.host}:{args.port}/docs")
-    
+
+    # uvloop + httptools are the C-accelerated event loop and HTTP parser;
+    # multiple workers scale across cores (reload mode needs a single worker)
     uvicorn.run(
         "api_server:app",
         host=args.host,
         port=args.port,
+        workers=1 if args.reload else args.workers,
+        loop="uvloop",
+        http="httptools",
         reload=args.reload,
         log_level="info"
     )
\ No newline at end of file
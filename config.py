@@ -1,6 +1,7 @@
 """
 Configuration management for RAG-Anything project.
 """
+import functools
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -37,12 +38,19 @@ class Config:
     
     # Processing Configuration
     MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
+    MAX_CONCURRENT_DOCS = int(os.getenv("MAX_CONCURRENT_DOCS", "8"))
     PARSE_METHOD = os.getenv("PARSE_METHOD", "auto")
     DEVICE = os.getenv("DEVICE", "cpu")
     
     # Embedding Configuration
     EMBEDDING_DIM = 3072  # text-embedding-3-large dimension
     MAX_TOKEN_SIZE = 8192
+
+    # Semantic Cache Configuration
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+    # Task Queue Configuration (optional; empty disables the external queue)
+    REDIS_URL = os.getenv("REDIS_URL", "")
     
     @classmethod
     def validate_config(cls):
@@ -66,18 +74,28 @@ class Config:
     @classmethod
     def get_processed_files_list(cls):
         """Get list of already processed files."""
-        processed_files = []
-        if cls.PROCESSED_DIR.exists():
-            for file_path in cls.PROCESSED_DIR.rglob("*"):
-                if file_path.is_file():
-                    processed_files.append(file_path.name)
-        return processed_files
+        # os.scandir reuses the dirent file type, so no extra stat per entry
+        if not cls.PROCESSED_DIR.exists():
+            return []
+        return [entry.name for entry in os.scandir(cls.PROCESSED_DIR) if entry.is_file()]
     
     @classmethod
     def mark_file_as_processed(cls, file_path: Path):
         """Mark a file as processed by moving it to processed directory."""
         if file_path.exists() and file_path.parent == cls.PENDING_DIR:
             destination = cls.PROCESSED_DIR / file_path.name
-            file_path.rename(destination)
+            # os.replace is atomic and overwrites an existing destination
+            os.replace(file_path, destination)
             return destination
-        return file_path
\ No newline at end of file
+        return file_path
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the shared, validated Config instance.
+
+    Validation creates the storage directories, so running it once at
+    first access avoids repeating the mkdir syscalls on every request.
+    """
+    config = Config()
+    config.validate_config()
+    return config
@@ -0,0 +1,120 @@
+"""
+LRU cache for embedding calls.
+
+Repeat strings (identical questions, re-processed chunks) skip the remote
+embedding API entirely. A single module-level cache instance is shared so
+every caller hits the same pool.
+"""
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class BatchingEmbedder:
+    """Coalesce concurrent embedding calls into one provider request.
+
+    LightRAG tends to call the embedding function with small text lists
+    per chunk, each paying full HTTP overhead. Concurrent callers queue
+    their texts here and a single worker drains up to max_batch items
+    (waiting at most max_wait_ms for stragglers) into one request.
+    """
+
+    def __init__(self, embed_func, max_batch: int = 256, max_wait_ms: int = 10):
+        self._embed_func = embed_func
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+
+    async def embed(self, texts):
+        """Embed texts, sharing a request with any concurrent callers."""
+        if self._queue is None:
+            # Created lazily so the queue binds to the running loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        for text, future in zip(texts, futures):
+            self._queue.put_nowait((text, future))
+        return [await future for future in futures]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            batch = [item]
+            deadline = loop.time() + self._max_wait
+
+            # Drain whatever arrives inside the window, up to max_batch
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                embeddings = await self._embed_func([text for text, _ in batch])
+                for (_, future), embedding in zip(batch, embeddings):
+                    if not future.done():
+                        future.set_result(embedding)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+class EmbeddingCache:
+    """LRU embedding cache keyed by SHA-256 of the input text."""
+
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, text: str):
+        """Return the cached embedding for text, or None."""
+        key = self._key(text)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        return None
+
+    def put(self, text: str, embedding):
+        """Store an embedding, evicting the least recently used entry if full."""
+        key = self._key(text)
+        self._cache[key] = embedding
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+# Shared pool: QueryInterface, RAGAnything and the API server all hit this.
+embedding_cache = EmbeddingCache()
+
+async def cached_embed(texts, embed_func):
+    """Embed texts via embed_func, serving repeats from the shared cache.
+
+    Args:
+        texts: List of strings to embed
+        embed_func: Async callable taking a list of texts, returning embeddings
+
+    Returns:
+        Embeddings in the same order as texts
+    """
+    missing = [t for t in texts if embedding_cache.get(t) is None]
+
+    if missing:
+        fresh = await embed_func(missing)
+        for text, embedding in zip(missing, fresh):
+            embedding_cache.put(text, embedding)
+    elif texts:
+        logger.debug(f"Embedding cache hit for all {len(texts)} texts")
+
+    return [embedding_cache.get(t) for t in texts]
@@ -74,13 +74,19 @@ async def batch_processing_example():
             "What are the key findings from all the processed documents?"
         ]
         
-        for i, question in enumerate(questions, 1):
+        # Fire all queries concurrently: the workload is network-bound, so
+        # wall-time is roughly the slowest question instead of the sum
+        answers = await asyncio.gather(
+            *(rag_manager.query(question, mode="hybrid") for question in questions),
+            return_exceptions=True
+        )
+
+        for i, (question, answer) in enumerate(zip(questions, answers), 1):
             print(f"\n{i}. Question: {question}")
-            try:
-                answer = await rag_manager.query(question, mode="hybrid")
+            if isinstance(answer, Exception):
+                print(f"   ❌ Error: {answer}")
+            else:
                 print(f"   Answer: {answer[:200]}..." if len(answer) > 200 else f"   Answer: {answer}")
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
     
     except Exception as e:
         print(f"❌ Error during querying: {e}")
@@ -3,7 +3,8 @@ Fix for multimodal processing issues.
 """
 
 import asyncio
-from config import Config
+from config import Config, get_config
+from embedding_cache import cached_embed
 
 async def fix_and_test_multimodal():
     """Fix multimodal processing and test with the bank statement."""
@@ -11,12 +12,12 @@ async def fix_and_test_multimodal():
     print("🔧 Fixing Multimodal Processing Issues...")
     print("=" * 50)
     
-    # Check API key first
-    config = Config()
-    if not config.OPENAI_API_KEY or config.OPENAI_API_KEY == "your_openai_api_key_here":
+    # Check API key first (before get_config(), which raises without one)
+    if not Config.OPENAI_API_KEY or Config.OPENAI_API_KEY == "your_openai_api_key_here":
         print("❌ Please set your OpenAI API key in the .env file first!")
         print("Edit .env file and add: OPENAI_API_KEY=sk-your-actual-key")
         return False
+    config = get_config()
     
     try:
         # Initialize with proper multimodal support
@@ -43,11 +44,14 @@ async def fix_and_test_multimodal():
             embedding_func=EmbeddingFunc(
                 embedding_dim=config.EMBEDDING_DIM,
                 max_token_size=config.MAX_TOKEN_SIZE,
-                func=lambda texts: openai_embed(
+                func=lambda texts: cached_embed(
                     texts,
-                    model=config.EMBEDDING_MODEL,
-                    api_key=config.OPENAI_API_KEY,
-                    base_url=config.OPENAI_BASE_URL,
+                    lambda missing: openai_embed(
+                        missing,
+                        model=config.EMBEDDING_MODEL,
+                        api_key=config.OPENAI_API_KEY,
+                        base_url=config.OPENAI_BASE_URL,
+                    ),
                 ),
             ),
         )
@@ -58,10 +62,10 @@ async def fix_and_test_multimodal():
         
         print("2. Creating RAGAnything with complete multimodal support...")
         
-        # Vision model function
-        def vision_model_func(prompt, system_prompt=None, history_messages=[], image_data=None, **kwargs):
+        # Vision model function (async so modal captioning can run concurrently)
+        async def vision_model_func(prompt, system_prompt=None, history_messages=[], image_data=None, **kwargs):
             if image_data:
-                return openai_complete_if_cache(
+                return await openai_complete_if_cache(
                     config.VISION_MODEL,
                     "",
                     system_prompt=None,
@@ -78,7 +82,7 @@ async def fix_and_test_multimodal():
                     **kwargs,
                 )
             else:
-                return openai_complete_if_cache(
+                return await openai_complete_if_cache(
                     config.LLM_MODEL,
                     prompt,
                     system_prompt=system_prompt,
@@ -87,10 +91,10 @@ async def fix_and_test_multimodal():
                     base_url=config.OPENAI_BASE_URL,
                     **kwargs,
                 )
-        
+
         # LLM model function for table processing
-        def llm_model_func(prompt, system_prompt=None, history_messages=[], **kwargs):
-            return openai_complete_if_cache(
+        async def llm_model_func(prompt, system_prompt=None, history_messages=[], **kwargs):
+            return await openai_complete_if_cache(
                 config.LLM_MODEL,
                 prompt,
                 system_prompt=system_prompt,
@@ -152,13 +156,18 @@ async def test_bank_statement_queries():
             "What type of financial information is available in the processed documents?"
         ]
         
-        for i, query in enumerate(bank_queries, 1):
+        # Run all queries concurrently so wall-time is one round trip, not five
+        answers = await asyncio.gather(
+            *(interface.ask(query, mode="hybrid") for query in bank_queries),
+            return_exceptions=True
+        )
+
+        for i, (query, answer) in enumerate(zip(bank_queries, answers), 1):
             print(f"\n{i}. {query}")
-            try:
-                answer = await interface.ask(query, mode="hybrid")
+            if isinstance(answer, Exception):
+                print(f"   ❌ {answer}")
+            else:
                 print(f"   💡 {answer[:300]}..." if len(answer) > 300 else f"   💡 {answer}")
-            except Exception as e:
-                print(f"   ❌ {e}")
         
         print("\n🎉 Bank statement analysis complete!")
         
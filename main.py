@@ -2,132 +2,191 @@
 Main application entry point for RAG-Anything.
 """
 import asyncio
+import functools
 import sys
 from pathlib import Path
-from query_interface import QueryInterface, interactive_mode, quick_query, quick_process_and_query
+
+# query_interface pulls in RAGAnything/LightRAG and their numerical stack;
+# import it inside the handlers that need it so the usage/help path (and
+# shell completion) doesn't pay that cold-start cost.
+
+@functools.lru_cache(maxsize=1)
+def _get_interface() -> "QueryInterface":
+    """Shared QueryInterface so subcommands reuse one RAGManager."""
+    from query_interface import QueryInterface
+    return QueryInterface()
+
+async def _initialized_interface() -> "QueryInterface":
+    """Return the shared interface, initializing it on first use."""
+    interface = _get_interface()
+    if not interface.rag_manager:
+        await interface.initialize()
+    return interface
+
+# One constant, one write: line-buffered TTYs flush per print call
+USAGE = "\n".join([
+    "🚀 RAG-Anything - Multimodal Document Query System",
+    "",
+    "Usage:",
+    "  python main.py interactive              # Start interactive mode",
+    "  python main.py query <question>         # Quick query",
+    "  python main.py batch-query <file>       # Query once per line of <file>, concurrently",
+    "  python main.py process <file_path>      # Process a document",
+    "  python main.py add-and-ask <file_path> <question>  # Process document and ask",
+    "  python main.py remove <doc_name>        # Remove specific document",
+    "  python main.py remove all               # Remove all documents",
+    "  python main.py list                     # List processed documents",
+    "  python main.py clean                    # Interactive cleanup",
+    "  python main.py api [host] [port]        # Start API server",
+    "  python main.py ui                       # Start Streamlit web interface",
+    "",
+    "Examples:",
+    "  python main.py interactive",
+    "  python main.py query 'What are the main findings?'",
+    "  python main.py process ./documents/report.pdf",
+    "  python main.py add-and-ask ./report.pdf 'Summarize the key results'",
+    "  python main.py remove 'bank statement.pdf'",
+    "  python main.py remove all",
+    "  python main.py list",
+    "  python main.py api                      # Start API on 127.0.0.1:8000",
+    "  python main.py api 0.0.0.0 8080         # Start API on all interfaces, port 8080",
+    "  python main.py ui                       # Start Streamlit interface",
+])
+
+async def _cmd_interactive(argv):
+    from query_interface import interactive_mode
+    await interactive_mode()
+
+async def _cmd_query(argv):
+    from query_interface import quick_query
+    question = " ".join(argv[2:])
+    print(f"🤔 Querying: {question}")
+    answer = await quick_query(question)
+    print(f"\n💡 Answer:\n{answer}")
+
+async def _cmd_batch_query(argv):
+    questions_file = Path(argv[2])
+    if not questions_file.exists():
+        print(f"❌ File not found: {questions_file}")
+        return
+
+    questions = [line.strip() for line in questions_file.read_text().splitlines() if line.strip()]
+    if not questions:
+        print("❌ No questions found in file")
+        return
+
+    print(f"🤔 Asking {len(questions)} questions concurrently...")
+    interface = await _initialized_interface()
+    answers = await interface.ask_many(questions)
+
+    for question, answer in zip(questions, answers):
+        print(f"\n❓ {question}")
+        if isinstance(answer, Exception):
+            print(f"❌ Error: {answer}")
+        else:
+            print(f"💡 {answer}")
+
+async def _cmd_process(argv):
+    interface = await _initialized_interface()
+    await interface.add_document(argv[2])
+
+async def _cmd_add_and_ask(argv):
+    from query_interface import quick_process_and_query
+    file_path = argv[2]
+    question = " ".join(argv[3:])
+    print(f"📄 Processing: {file_path}")
+    print(f"🤔 Question: {question}")
+    answer = await quick_process_and_query(file_path, question)
+    print(f"\n💡 Answer:\n{answer}")
+
+async def _cmd_remove(argv):
+    target = argv[2]
+    interface = await _initialized_interface()
+
+    if target.lower() == "all":
+        success = await interface.remove_all_documents()
+    else:
+        success = await interface.remove_document(target)
+
+    if success:
+        print(f"✅ Successfully removed: {target}")
+    else:
+        print(f"❌ Failed to remove: {target}")
+
+async def _cmd_list(argv):
+    interface = await _initialized_interface()
+    await interface.list_processed_documents()
+
+async def _cmd_clean(argv):
+    interface = await _initialized_interface()
+    await interface.clean_knowledge_base()
+
+async def _cmd_api(argv):
+    print("🚀 Starting RAG-Anything API Server...")
+
+    host = argv[2] if len(argv) > 2 else "127.0.0.1"
+    port = int(argv[3]) if len(argv) > 3 else 8000
+
+    import subprocess
+    subprocess.run([
+        sys.executable, "api_server.py",
+        "--host", host,
+        "--port", str(port)
+    ])
+
+async def _cmd_ui(argv):
+    print("🌟 Starting RAG-Anything Streamlit Interface...")
+    import subprocess
+    subprocess.run([sys.executable, "start_streamlit.py"])
+
+# command -> (minimum argc, handler); argc is validated once in main()
+HANDLERS = {
+    "interactive": (2, _cmd_interactive),
+    "query": (3, _cmd_query),
+    "batch-query": (3, _cmd_batch_query),
+    "process": (3, _cmd_process),
+    "add-and-ask": (4, _cmd_add_and_ask),
+    "remove": (3, _cmd_remove),
+    "list": (2, _cmd_list),
+    "clean": (2, _cmd_clean),
+    "api": (2, _cmd_api),
+    "ui": (2, _cmd_ui),
+    "streamlit": (2, _cmd_ui),
+}
+
+ARGC_HINTS = {
+    "query": "❌ Please provide a question",
+    "batch-query": "❌ Please provide a file with one question per line",
+    "process": "❌ Please provide a file path",
+    "add-and-ask": "❌ Please provide file path and question",
+    "remove": "❌ Please provide a document name or 'all' to remove everything",
+}
 
 async def main():
     """Main application function."""
     if len(sys.argv) < 2:
-        print("🚀 RAG-Anything - Multimodal Document Query System")
-        print("\nUsage:")
-        print("  python main.py interactive              # Start interactive mode")
-        print("  python main.py query <question>         # Quick query")
-        print("  python main.py process <file_path>      # Process a document")
-        print("  python main.py add-and-ask <file_path> <question>  # Process document and ask")
-        print("  python main.py remove <doc_name>        # Remove specific document")
-        print("  python main.py remove all               # Remove all documents")
-        print("  python main.py list                     # List processed documents")
-        print("  python main.py clean                    # Interactive cleanup")
-        print("  python main.py api [host] [port]        # Start API server")
-        print("  python main.py ui                       # Start Streamlit web interface")
-        print("\nExamples:")
-        print("  python main.py interactive")
-        print("  python main.py query 'What are the main findings?'")
-        print("  python main.py process ./documents/report.pdf")
-        print("  python main.py add-and-ask ./report.pdf 'Summarize the key results'")
-        print("  python main.py remove 'bank statement.pdf'")
-        print("  python main.py remove all")
-        print("  python main.py list")
-        print("  python main.py api                      # Start API on 127.0.0.1:8000")
-        print("  python main.py api 0.0.0.0 8080         # Start API on all interfaces, port 8080")
-        print("  python main.py ui                       # Start Streamlit interface")
+        print(USAGE)
         return
-    
+
     command = sys.argv[1].lower()
-    
+
     try:
-        if command == "interactive":
-            await interactive_mode()
-        
-        elif command == "query":
-            if len(sys.argv) < 3:
-                print("❌ Please provide a question")
-                return
-            
-            question = " ".join(sys.argv[2:])
-            print(f"🤔 Querying: {question}")
-            answer = await quick_query(question)
-            print(f"\n💡 Answer:\n{answer}")
-        
-        elif command == "process":
-            if len(sys.argv) < 3:
-                print("❌ Please provide a file path")
-                return
-            
-            file_path = sys.argv[2]
-            interface = QueryInterface()
-            await interface.initialize()
-            await interface.add_document(file_path)
-        
-        elif command == "add-and-ask":
-            if len(sys.argv) < 4:
-                print("❌ Please provide file path and question")
-                return
-            
-            file_path = sys.argv[2]
-            question = " ".join(sys.argv[3:])
-            print(f"📄 Processing: {file_path}")
-            print(f"🤔 Question: {question}")
-            answer = await quick_process_and_query(file_path, question)
-            print(f"\n💡 Answer:\n{answer}")
-        
-        elif command == "remove":
-            if len(sys.argv) < 3:
-                print("❌ Please provide a document name or 'all' to remove everything")
-                return
-            
-            target = sys.argv[2]
-            interface = QueryInterface()
-            await interface.initialize()
-            
-            if target.lower() == "all":
-                success = await interface.remove_all_documents()
-            else:
-                success = await interface.remove_document(target)
-            
-            if success:
-                print(f"✅ Successfully removed: {target}")
-            else:
-                print(f"❌ Failed to remove: {target}")
-        
-        elif command == "list":
-            interface = QueryInterface()
-            await interface.initialize()
-            await interface.list_processed_documents()
-        
-        elif command == "clean":
-            interface = QueryInterface()
-            await interface.initialize()
-            await interface.clean_knowledge_base()
-        
-        elif command == "api":
-            # Start API server
-            print("🚀 Starting RAG-Anything API Server...")
-            
-            host = sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1"
-            port = int(sys.argv[3]) if len(sys.argv) > 3 else 8000
-            
-            import subprocess
-            subprocess.run([
-                sys.executable, "api_server.py", 
-                "--host", host, 
-                "--port", str(port)
-            ])
-        
-        elif command == "ui" or command == "streamlit":
-            # Start Streamlit interface
-            print("🌟 Starting RAG-Anything Streamlit Interface...")
-            import subprocess
-            subprocess.run([sys.executable, "start_streamlit.py"])
-        
-        else:
+        spec = HANDLERS.get(command)
+        if not spec:
             print(f"❌ Unknown command: {command}")
             print("Use 'python main.py' to see available commands")
-    
+            return
+
+        min_argc, handler = spec
+        if len(sys.argv) < min_argc:
+            print(ARGC_HINTS.get(command, "❌ Missing argument"))
+            return
+
+        await handler(sys.argv)
+
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
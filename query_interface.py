@@ -2,19 +2,58 @@
 Simple query interface for RAG-Anything.
 """
 import asyncio
+import re
+import sys
+import time
 from typing import Optional
 from rag_manager import RAGManager
 
+# Status icons for every (cache, processed dir, knowledge base) combination,
+# keyed by a 3-bit mask so the listing loop does one lookup per document.
+_STATUS = {
+    0b000: "❓",
+    0b001: "🧠",
+    0b010: "📁",
+    0b011: "📁 🧠",
+    0b100: "💾",
+    0b101: "💾 🧠",
+    0b110: "💾 📁",
+    0b111: "💾 📁 🧠",
+}
+
+# Compiled once at import; these run on every knowledge-base stats request.
+_DOC_RE = re.compile(r'(\d+)\s*documents?', re.IGNORECASE)
+_ENT_RE = re.compile(r'(\d+)\s*entit(?:y|ies)', re.IGNORECASE)
+_REL_RE = re.compile(r'(\d+)\s*relationships?', re.IGNORECASE)
+
 class QueryInterface:
     """Simple interface for querying processed documents."""
     
     def __init__(self):
         self.rag_manager = None
+        self.semantic_cache = None
+        self._docs_info_memo = None  # (scan key, docs_info) cache
+        self._doc_list_memo = None   # (scan key, doc list) cache
+        self._status_memo = None     # (timestamp, status) short-TTL cache
+        self._docs_lower = None      # [(lowercased, original)] for substring matching
+        self._query_sem = asyncio.Semaphore(8)  # bounds concurrent LLM queries
     
-    async def initialize(self, use_existing: bool = True):
-        """Initialize the query interface."""
-        self.rag_manager = RAGManager(use_existing_instance=use_existing)
-        await self.rag_manager.initialize()
+    async def initialize(self, use_existing: bool = True, rag_manager=None,
+                         mode: str = "ingest"):
+        """Initialize the query interface.
+
+        An already-constructed RAGManager can be injected so several
+        callers (e.g. a test harness's phases) share one instance
+        instead of each paying the model and storage setup again.
+        Query-heavy callers can pass mode="query" to skip the ingest
+        setup (pipeline status, modal-processor wiring), which
+        process_document brings up lazily on first use.
+        """
+        self.rag_manager = rag_manager or RAGManager(use_existing_instance=use_existing)
+        # No-op when the injected manager is already initialized
+        await self.rag_manager.initialize(mode)
+        # One cache pool for CLI, interactive and HTTP callers alike
+        self.semantic_cache = self.rag_manager.semantic_cache
         print("✅ RAG system initialized successfully!")
     
     async def add_document(self, file_path: str, force_reprocess: bool = False):
@@ -30,11 +69,47 @@ class QueryInterface:
         return success
     
     async def process_all_pending(self, force_reprocess: bool = False):
-        """Process all documents in the pending directory."""
+        """Process all documents in the pending directory.
+
+        Runs as a small pipeline: a producer feeds pending files into a
+        bounded queue while MAX_WORKERS consumers process them
+        concurrently, so one file's LLM/embedding round trips overlap
+        with the next file's parsing and I/O.
+        """
         if not self.rag_manager:
             raise RuntimeError("Query interface not initialized. Call initialize() first.")
-        
-        results = await self.rag_manager.process_pending_documents(force_reprocess)
+
+        from config import Config
+
+        queue = asyncio.Queue(maxsize=4)
+        results = {"processed": 0, "skipped": 0, "failed": 0}
+
+        async def produce():
+            for file_path in Config.PENDING_DIR.glob("*"):
+                if file_path.is_file():
+                    await queue.put(file_path)
+            for _ in range(Config.MAX_WORKERS):
+                await queue.put(None)  # one sentinel per consumer
+
+        async def consume():
+            while True:
+                file_path = await queue.get()
+                if file_path is None:
+                    return
+                try:
+                    success = await self.rag_manager.process_document(file_path, force_reprocess)
+                    if success:
+                        results["processed"] += 1
+                    elif str(file_path) in self.rag_manager._processed_files_cache:
+                        results["skipped"] += 1
+                    else:
+                        results["failed"] += 1
+                except Exception as e:
+                    print(f"❌ Failed to process {file_path}: {e}")
+                    results["failed"] += 1
+
+        await asyncio.gather(produce(), *(consume() for _ in range(Config.MAX_WORKERS)))
+
         print(f"📊 Processing results: {results}")
         return results
     
@@ -44,12 +119,35 @@ class QueryInterface:
             raise RuntimeError("Query interface not initialized. Call initialize() first.")
         
         try:
-            answer = await self.rag_manager.query(question, mode)
-            return answer
+            # The semantic cache lives in RAGManager.query, so every
+            # caller — CLI, interactive or HTTP — shares one pool
+            return await self.rag_manager.query(question, mode)
         except Exception as e:
             print(f"❌ Query failed: {e}")
             raise
     
+    async def ask_many(self, questions: list, mode: str = "hybrid",
+                       limit: int = None) -> list:
+        """Ask several questions concurrently.
+
+        Queries are I/O-bound on the LLM API, so fanning out with a
+        bounded semaphore scales throughput nearly linearly up to the
+        limit. Callers can pass a tighter limit than the interface-wide
+        default (e.g. to stay under an endpoint's rate cap and avoid
+        429 retry latency). Returns answers in question order; failures
+        come back as the raised exception instead of aborting the batch.
+        """
+        if not self.rag_manager:
+            raise RuntimeError("Query interface not initialized. Call initialize() first.")
+
+        sem = asyncio.Semaphore(limit) if limit else self._query_sem
+
+        async def guarded(question):
+            async with sem:
+                return await self.ask(question, mode)
+
+        return await asyncio.gather(*(guarded(q) for q in questions), return_exceptions=True)
+
     async def remove_document(self, doc_identifier: str) -> bool:
         """Remove a specific document and its knowledge context."""
         if not self.rag_manager:
@@ -60,9 +158,15 @@ class QueryInterface:
             
             # First, list available documents to find exact match
             available_docs = self._get_processed_documents_list()
-            
+
+            # Lowercase the doc list once and reuse it across removals;
+            # invalidated together with the doc-list memo.
+            if self._docs_lower is None or len(self._docs_lower) != len(available_docs):
+                self._docs_lower = [(doc.lower(), doc) for doc in available_docs]
+
             # Find matching document
-            matches = [doc for doc in available_docs if doc_identifier.lower() in doc.lower()]
+            needle = doc_identifier.lower()
+            matches = [orig for low, orig in self._docs_lower if needle in low]
             
             if not matches:
                 print(f"❌ Document '{doc_identifier}' not found")
@@ -126,11 +230,25 @@ class QueryInterface:
                 print("❌ Operation cancelled")
                 return False
             
-            # Remove all documents
-            success_count = 0
-            for doc_name in docs:
-                if await self._remove_document_from_storage(doc_name):
-                    success_count += 1
+            # Remove all documents; the per-doc work is synchronous
+            # filesystem calls, so overlap them in threads with a bound
+            # on concurrency to avoid FD exhaustion
+            sem = asyncio.Semaphore(16)
+
+            async def _remove_one(doc_name):
+                async with sem:
+                    return await asyncio.to_thread(
+                        self._remove_document_sync, doc_name, True
+                    )
+
+            results = await asyncio.gather(*(_remove_one(d) for d in docs))
+            success_count = sum(1 for ok in results if ok)
+
+            # One cache write and one progress line for the whole batch
+            # instead of N of each
+            await asyncio.to_thread(self.rag_manager._save_processed_files_cache)
+            sys.stdout.write(f"📁 Moved {success_count} documents back to pending\n")
+            self._invalidate_docs_caches()
             
             # Clear storage directories
             await self._clear_storage_directories()
@@ -150,114 +268,174 @@ class QueryInterface:
             raise RuntimeError("Query interface not initialized. Call initialize() first.")
         
         try:
-            print("📋 Processed Documents")
-            print("=" * 60)
-            
+            # Buffer the whole report and write it once: per-line print
+            # calls each flush on line-buffered TTYs
+            lines = ["📋 Processed Documents", "=" * 60]
+
             # Get documents with source information
             docs_info = self._get_detailed_documents_info()
-            
+
             if not docs_info:
-                print("ℹ️ No documents have been processed yet")
-                print("\n💡 To add documents:")
-                print("  - Copy files to ./documents/pending/")
-                print("  - Run: python main.py process <file_path>")
+                lines.append("ℹ️ No documents have been processed yet")
+                lines.append("\n💡 To add documents:")
+                lines.append("  - Copy files to ./documents/pending/")
+                lines.append("  - Run: python main.py process <file_path>")
+                sys.stdout.write("\n".join(lines) + "\n")
                 return
-            
+
             # Display documents with details
             for i, (doc_name, info) in enumerate(docs_info.items(), 1):
-                status_icons = []
-                
-                if info['in_cache']:
-                    status_icons.append("💾")  # In cache
-                if info['in_processed_dir']:
-                    status_icons.append("📁")  # In processed directory
-                if info['in_knowledge_base']:
-                    status_icons.append("🧠")  # In knowledge base
-                
-                status = " ".join(status_icons) if status_icons else "❓"
-                
-                print(f"{i:2d}. {status} {doc_name}")
-                
+                mask = (
+                    (info['in_cache'] << 2)
+                    | (info['in_processed_dir'] << 1)
+                    | info['in_knowledge_base']
+                )
+                lines.append(f"{i:2d}. {_STATUS[mask]} {doc_name}")
+
                 # Show additional details if available
                 if info['file_size']:
-                    print(f"    📏 Size: {info['file_size']}")
+                    lines.append(f"    📏 Size: {info['file_size']}")
                 if info['process_date']:
-                    print(f"    📅 Processed: {info['process_date']}")
-            
-            print(f"\n📊 Total: {len(docs_info)} unique documents")
-            
+                    lines.append(f"    📅 Processed: {info['process_date']}")
+
+            lines.append(f"\n📊 Total: {len(docs_info)} unique documents")
+
             # Show legend
-            print("\n🔍 Status Legend:")
-            print("  💾 = In processing cache")
-            print("  📁 = In processed files directory") 
-            print("  🧠 = In knowledge base")
-            
+            lines.append("\n🔍 Status Legend:")
+            lines.append("  💾 = In processing cache")
+            lines.append("  📁 = In processed files directory")
+            lines.append("  🧠 = In knowledge base")
+
             # Show storage statistics
             status = self.rag_manager.get_status()
-            print(f"\n📁 Storage Info:")
-            print(f"  - Knowledge base: {status['storage_directories']['lightrag']}")
-            print(f"  - Cache entries: {status['processed_files_count']}")
-            print(f"  - Pending files: {status['pending_files_count']}")
-            
-            # Show knowledge base stats if available
+            lines.append("\n📁 Storage Info:")
+            lines.append(f"  - Knowledge base: {status['storage_directories']['lightrag']}")
+            lines.append(f"  - Cache entries: {status['processed_files_count']}")
+            lines.append(f"  - Pending files: {status['pending_files_count']}")
+
+            # Show knowledge base stats; the document count falls out of the
+            # scan above, so the KV store is not parsed a second time
             try:
-                kb_stats = await self._get_knowledge_base_stats()
+                kb_stats = {}
+                kb_doc_count = sum(1 for info in docs_info.values() if info['in_knowledge_base'])
+                if kb_doc_count:
+                    kb_stats['Documents'] = str(kb_doc_count)
+                from config import get_config
+                storage = get_config().LIGHTRAG_STORAGE_DIR
+                entity_count = self._count_storage_entries(storage / "vdb_entities.json", 'data.item')
+                if entity_count is not None:
+                    kb_stats['Entities'] = str(entity_count)
+                rel_count = self._count_storage_entries(storage / "vdb_relationships.json", 'data.item')
+                if rel_count is not None:
+                    kb_stats['Relationships'] = str(rel_count)
                 if kb_stats:
-                    print(f"\n🧠 Knowledge Base Stats:")
+                    lines.append("\n🧠 Knowledge Base Stats:")
                     for key, value in kb_stats.items():
-                        print(f"  - {key}: {value}")
+                        lines.append(f"  - {key}: {value}")
             except:
                 pass  # KB stats are optional
-            
+
+            sys.stdout.write("\n".join(lines) + "\n")
+
         except Exception as e:
             print(f"❌ Error listing documents: {e}")
     
+    def _iter_kb_filenames(self, config):
+        """Yield document filenames recorded in the LightRAG KV store.
+
+        Streams the JSON with ijson when available, so a large store is
+        never materialized just to read each entry's file_path; falls
+        back to a plain json.load otherwise.
+        """
+        import os
+
+        full_docs_file = config.LIGHTRAG_STORAGE_DIR / "kv_store_full_docs.json"
+        if not full_docs_file.exists():
+            return
+
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+
+        try:
+            if ijson is not None:
+                with open(full_docs_file, 'rb') as f:
+                    for doc_id, doc_info in ijson.kvitems(f, ''):
+                        if isinstance(doc_info, dict) and doc_info.get('file_path'):
+                            yield os.path.basename(doc_info['file_path'])
+            else:
+                import json
+                with open(full_docs_file, 'r', encoding='utf-8') as f:
+                    docs_data = json.load(f)
+                for doc_id, doc_info in docs_data.items():
+                    if isinstance(doc_info, dict) and 'file_path' in doc_info:
+                        yield os.path.basename(doc_info['file_path'])
+        except Exception:
+            # If we can't read LightRAG storage, that's okay
+            return
+
+    def _docs_scan_key(self, config):
+        """Cache key for document scans; changes whenever document state does."""
+        import os
+        try:
+            full_docs_file = config.LIGHTRAG_STORAGE_DIR / "kv_store_full_docs.json"
+            return (
+                os.stat(config.PROCESSED_DIR).st_mtime_ns if config.PROCESSED_DIR.exists() else 0,
+                os.stat(full_docs_file).st_mtime_ns if full_docs_file.exists() else 0,
+                len(getattr(self.rag_manager, '_processed_files_cache', ()))
+            )
+        except OSError:
+            return None
+
+    def _invalidate_docs_caches(self):
+        """Drop memoized document scans after a mutation."""
+        self._docs_info_memo = None
+        self._doc_list_memo = None
+        self._docs_lower = None
+
     def _get_detailed_documents_info(self) -> dict:
         """Get detailed information about processed documents."""
         try:
-            from config import Config
+            from config import get_config
             import os
             import json
             from datetime import datetime
             
-            config = Config()
+            config = get_config()
+
+            # A few stat calls validate the previous full scan
+            cache_key = self._docs_scan_key(config)
+            if cache_key is not None and self._docs_info_memo and self._docs_info_memo[0] == cache_key:
+                return self._docs_info_memo[1]
+
             docs_info = {}
-            
+
             # Check cache
             cache_docs = set()
             if hasattr(self.rag_manager, '_processed_files_cache'):
                 for cached_file in self.rag_manager._processed_files_cache:
                     if cached_file and isinstance(cached_file, str):
-                        filename = os.path.basename(cached_file)
+                        filename = os.path.basename(cached_file.replace('\\', '/'))
                         cache_docs.add(filename)
             
-            # Check processed directory
+            # Check processed directory (scandir reuses the stat data from readdir)
             processed_docs = {}
             if config.PROCESSED_DIR.exists():
-                for file_path in config.PROCESSED_DIR.iterdir():
-                    if file_path.is_file() and not file_path.name.startswith('.'):
-                        try:
-                            stat = file_path.stat()
-                            processed_docs[file_path.name] = {
-                                'size': f"{stat.st_size / 1024:.1f} KB",
-                                'modified': datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
-                            }
-                        except:
-                            processed_docs[file_path.name] = {'size': 'Unknown', 'modified': 'Unknown'}
+                with os.scandir(config.PROCESSED_DIR) as entries:
+                    for entry in entries:
+                        if entry.is_file() and not entry.name.startswith('.'):
+                            try:
+                                stat = entry.stat()
+                                processed_docs[entry.name] = {
+                                    'size': f"{stat.st_size / 1024:.1f} KB",
+                                    'modified': datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
+                                }
+                            except:
+                                processed_docs[entry.name] = {'size': 'Unknown', 'modified': 'Unknown'}
             
             # Check knowledge base
-            kb_docs = set()
-            try:
-                full_docs_file = config.LIGHTRAG_STORAGE_DIR / "kv_store_full_docs.json"
-                if full_docs_file.exists():
-                    with open(full_docs_file, 'r', encoding='utf-8') as f:
-                        docs_data = json.load(f)
-                        for doc_id, doc_info in docs_data.items():
-                            if isinstance(doc_info, dict) and 'file_path' in doc_info:
-                                filename = os.path.basename(doc_info['file_path'])
-                                kb_docs.add(filename)
-            except:
-                pass
+            kb_docs = set(self._iter_kb_filenames(config))
             
             # Combine all document names
             all_doc_names = cache_docs | set(processed_docs.keys()) | kb_docs
@@ -272,35 +450,85 @@ class QueryInterface:
                         'file_size': processed_docs.get(doc_name, {}).get('size'),
                         'process_date': processed_docs.get(doc_name, {}).get('modified')
                     }
-            
+
+            if cache_key is not None:
+                self._docs_info_memo = (cache_key, docs_info)
+
             return docs_info
             
         except Exception as e:
             print(f"Warning: Could not get detailed document info: {e}")
             return {}
     
+    @staticmethod
+    def _count_storage_entries(path, prefix='') -> Optional[int]:
+        """Count entries in a LightRAG storage JSON file without an LLM call.
+
+        KV stores are flat maps (count top-level keys); the vector DB files
+        keep their entries under a 'data' list. Streams with ijson when
+        available so large stores are never fully loaded.
+        """
+        if not path.exists():
+            return None
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+        try:
+            if ijson is not None:
+                with open(path, 'rb') as f:
+                    if prefix:
+                        return sum(1 for _ in ijson.items(f, prefix))
+                    return sum(1 for _ in ijson.kvitems(f, ''))
+            import json
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if prefix:
+                return len(data.get('data', []))
+            return len(data)
+        except Exception:
+            return None
+
     async def _get_knowledge_base_stats(self) -> dict:
         """Get knowledge base statistics."""
+        # Fast path: count entries straight out of the LightRAG storage
+        # files — deterministic and no LLM round-trip.
+        try:
+            from config import get_config
+            storage = get_config().LIGHTRAG_STORAGE_DIR
+            stats = {}
+            doc_count = self._count_storage_entries(storage / "kv_store_full_docs.json")
+            if doc_count is not None:
+                stats['Documents'] = str(doc_count)
+            entity_count = self._count_storage_entries(storage / "vdb_entities.json", 'data.item')
+            if entity_count is not None:
+                stats['Entities'] = str(entity_count)
+            rel_count = self._count_storage_entries(storage / "vdb_relationships.json", 'data.item')
+            if rel_count is not None:
+                stats['Relationships'] = str(rel_count)
+            if stats:
+                return stats
+        except Exception:
+            pass
+
+        # Fallback: ask the model and parse numbers out of the prose
         try:
-            # Try to query the knowledge base for stats
             stats_query = "How many documents, entities, and relationships are in this knowledge base?"
             response = await self.ask(stats_query)
             
             # Parse basic numbers from response
-            import re
-            
             stats = {}
-            
+
             # Look for numbers in the response
-            doc_match = re.search(r'(\d+)\s*documents?', response, re.IGNORECASE)
+            doc_match = _DOC_RE.search(response)
             if doc_match:
                 stats['Documents'] = doc_match.group(1)
-            
-            entity_match = re.search(r'(\d+)\s*entit(?:y|ies)', response, re.IGNORECASE)
+
+            entity_match = _ENT_RE.search(response)
             if entity_match:
                 stats['Entities'] = entity_match.group(1)
-            
-            rel_match = re.search(r'(\d+)\s*relationships?', response, re.IGNORECASE)
+
+            rel_match = _REL_RE.search(response)
             if rel_match:
                 stats['Relationships'] = rel_match.group(1)
             
@@ -374,103 +602,78 @@ class QueryInterface:
     def _get_processed_documents_list(self) -> list:
         """Get list of processed documents with proper deduplication."""
         try:
-            from config import Config
-            import os
-            
-            config = Config()
-            all_docs = set()  # Use set for automatic deduplication
-            
-            # Get from cache (these are full file paths)
-            if hasattr(self.rag_manager, '_processed_files_cache'):
-                for cached_file in self.rag_manager._processed_files_cache:
-                    if cached_file and isinstance(cached_file, str):
-                        # Extract just the filename
-                        filename = os.path.basename(cached_file)
-                        if filename and filename != cached_file:  # Only if it was actually a path
-                            all_docs.add(filename)
-                        else:
-                            all_docs.add(cached_file)  # It's already just a filename
-            
-            # Get from processed directory (these are already filenames)
-            if config.PROCESSED_DIR.exists():
-                for file_path in config.PROCESSED_DIR.iterdir():
-                    if file_path.is_file() and not file_path.name.startswith('.'):
-                        all_docs.add(file_path.name)
-            
-            # Get from LightRAG storage (check what documents are actually in the knowledge base)
-            try:
-                if config.LIGHTRAG_STORAGE_DIR.exists():
-                    # Check if there are any documents in the knowledge base
-                    full_docs_file = config.LIGHTRAG_STORAGE_DIR / "kv_store_full_docs.json"
-                    if full_docs_file.exists():
-                        import json
-                        with open(full_docs_file, 'r', encoding='utf-8') as f:
-                            docs_data = json.load(f)
-                            # Extract document names from the storage
-                            for doc_id, doc_info in docs_data.items():
-                                if isinstance(doc_info, dict) and 'file_path' in doc_info:
-                                    filename = os.path.basename(doc_info['file_path'])
-                                    all_docs.add(filename)
-            except Exception as e:
-                # If we can't read LightRAG storage, that's okay
-                pass
-            
-            # Clean up and filter valid documents
-            clean_docs = []
-            for doc in all_docs:
-                if doc and isinstance(doc, str):
-                    # Remove any remaining path separators
-                    clean_name = doc.replace('\\', '/').split('/')[-1]
-                    # Filter out system files and empty names
-                    if clean_name and not clean_name.startswith('.') and len(clean_name) > 1:
-                        clean_docs.append(clean_name)
-            
-            # Remove exact duplicates and sort
-            unique_docs = list(set(clean_docs))
-            return sorted(unique_docs)
+            from config import get_config
+
+            config = get_config()
+
+            cache_key = self._docs_scan_key(config)
+            if cache_key is not None and self._doc_list_memo and self._doc_list_memo[0] == cache_key:
+                return self._doc_list_memo[1]
+
+            # The detailed scan already merges the cache, the processed
+            # directory and the knowledge base and filters system files —
+            # reuse it instead of repeating the same three scans here.
+            unique_docs = sorted(self._get_detailed_documents_info())
+
+            if cache_key is not None:
+                self._doc_list_memo = (cache_key, unique_docs)
+
+            return unique_docs
             
         except Exception as e:
             print(f"Warning: Could not get document list: {e}")
             return []
     
-    async def _remove_document_from_storage(self, doc_name: str) -> bool:
-        """Remove document from storage and cache."""
+    def _remove_document_sync(self, doc_name: str, defer_save: bool = False) -> bool:
+        """Synchronous removal body; safe to run in a worker thread.
+
+        With defer_save=True the processed-files cache is mutated but not
+        written out and per-file chatter is suppressed — bulk callers save
+        once and report once after the whole batch.
+        """
         try:
-            # Remove from processed files cache
-            cache_to_remove = []
-            for cached_file in self.rag_manager._processed_files_cache:
-                if doc_name in cached_file or cached_file.endswith(doc_name):
-                    cache_to_remove.append(cached_file)
-            
-            for item in cache_to_remove:
+            # Remove from processed files cache via the basename index —
+            # O(1) instead of scanning every cached path per removal
+            to_discard = self.rag_manager._basename_index.pop(doc_name, set())
+            for item in to_discard:
                 self.rag_manager._processed_files_cache.discard(item)
-            
+
             # Save updated cache
-            self.rag_manager._save_processed_files_cache()
-            
+            if not defer_save:
+                self.rag_manager._save_processed_files_cache()
+
             # Move file back to pending if it exists in processed
-            from config import Config
-            config = Config()
-            
+            from config import get_config
+            config = get_config()
+
             processed_file = config.PROCESSED_DIR / doc_name
             if processed_file.exists():
                 pending_file = config.PENDING_DIR / doc_name
                 processed_file.rename(pending_file)
-                print(f"📁 Moved {doc_name} back to pending directory")
-            
+                if not defer_save:
+                    print(f"📁 Moved {doc_name} back to pending directory")
+
             return True
-            
+
         except Exception as e:
             print(f"Error removing document from storage: {e}")
             return False
+
+    async def _remove_document_from_storage(self, doc_name: str) -> bool:
+        """Remove document from storage and cache."""
+        success = await asyncio.to_thread(self._remove_document_sync, doc_name)
+        if success:
+            self._invalidate_docs_caches()
+        return success
     
     async def _clear_storage_directories(self):
         """Clear storage directories for complete reset."""
         try:
-            from config import Config
+            from config import get_config
+            import os
             import shutil
-            
-            config = Config()
+
+            config = get_config()
             
             # Clear LightRAG storage (this removes the knowledge graph)
             if config.LIGHTRAG_STORAGE_DIR.exists():
@@ -485,14 +688,20 @@ class QueryInterface:
                     cache_file.unlink()
                 print("🗑️ Cleared document cache")
             
-            # Move all processed files back to pending
+            # Move all processed files back to pending (rename is a
+            # metadata-only operation; no need to read file contents)
             if config.PROCESSED_DIR.exists():
-                for file in config.PROCESSED_DIR.iterdir():
-                    if file.is_file():
-                        (config.PENDING_DIR / file.name).write_bytes(file.read_bytes())
-                        file.unlink()
+                with os.scandir(config.PROCESSED_DIR) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            try:
+                                os.replace(entry.path, config.PENDING_DIR / entry.name)
+                            except OSError:
+                                # Cross-filesystem move fallback
+                                shutil.move(entry.path, str(config.PENDING_DIR / entry.name))
                 print("📁 Moved processed files back to pending")
-            
+
+            self._invalidate_docs_caches()
         except Exception as e:
             print(f"Warning: Could not fully clear storage: {e}")
     
@@ -502,7 +711,14 @@ class QueryInterface:
             print("❌ Query interface not initialized")
             return
         
-        status = self.rag_manager.get_status()
+        # get_status() walks the storage directories; memoize it briefly so
+        # repeated polling (e.g. from the interactive loop) stays cheap.
+        now = time.monotonic()
+        if self._status_memo and now - self._status_memo[0] < 5:
+            status = self._status_memo[1]
+        else:
+            status = self.rag_manager.get_status()
+            self._status_memo = (now, status)
         print("📊 System Status:")
         print(f"  - LightRAG storage exists: {status['lightrag_storage_exists']}")
         print(f"  - Processed files: {status['processed_files_count']}")
@@ -527,32 +743,71 @@ async def quick_process_and_query(file_path: str, question: str, mode: str = "hy
     return await interface.ask(question, mode)
 
 # Interactive CLI interface
+async def _make_prompt():
+    """Build the interactive prompt reader.
+
+    Uses prompt_toolkit (history, completion, async-friendly stdin) when
+    installed; falls back to plain input() run in a worker thread so the
+    event loop is never blocked waiting on the keyboard.
+    """
+    try:
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.completion import WordCompleter
+        from prompt_toolkit.history import FileHistory
+        from config import get_config
+
+        config = get_config()
+        config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        session = PromptSession(
+            history=FileHistory(str(config.CACHE_DIR / "cli_history")),
+            completer=WordCompleter(
+                ["ask", "add", "process", "status", "list", "remove", "clean", "quit"]
+            ),
+        )
+
+        async def read_command():
+            return await session.prompt_async("\n> ")
+
+        return read_command
+    except ImportError:
+        async def read_command():
+            return await asyncio.to_thread(input, "\n> ")
+
+        return read_command
+
 async def interactive_mode():
     """Interactive command-line interface."""
     interface = QueryInterface()
-    
+
     print("🚀 RAG-Anything Interactive Mode")
     print("Initializing...")
-    
+
     await interface.initialize()
     interface.status()
-    
-    print("\n📚 Available commands:")
-    print("  - ask <question>: Ask a question")
-    print("  - add <file_path>: Add a document")
-    print("  - process: Process all pending documents")
-    print("  - status: Show system status")
-    print("  - list: List processed documents")
-    print("  - remove <doc_name>: Remove specific document")
-    print("  - remove all: Remove all documents")
-    print("  - clean: Interactive cleanup")
-    print("  - quit: Exit")
+
+    read_command = await _make_prompt()
+
+    print("\n".join([
+        "",
+        "📚 Available commands:",
+        "  - ask <question>: Ask a question",
+        "  - add <file_path>: Add a document",
+        "  - process: Process all pending documents",
+        "  - status: Show system status",
+        "  - list: List processed documents",
+        "  - remove <doc_name>: Remove specific document",
+        "  - remove all: Remove all documents",
+        "  - clean: Interactive cleanup",
+        "  - quit: Exit",
+    ]))
     
     while True:
         try:
-            command = input("\n> ").strip()
-            
+            command = (await read_command()).strip()
+
             if command.lower() in ['quit', 'exit', 'q']:
+                if interface.semantic_cache is not None:
+                    interface.semantic_cache.save()
                 print("👋 Goodbye!")
                 break
             
@@ -592,7 +847,7 @@ async def interactive_mode():
                 print("❌ Unknown command. Available commands:")
                 print("  ask, add, process, status, list, remove, clean, quit")
         
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\n👋 Goodbye!")
             break
         except Exception as e:
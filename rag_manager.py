@@ -2,11 +2,20 @@
 RAG Manager: Core class for managing RAG-Anything operations.
 """
 import asyncio
+import concurrent.futures
+import functools
+import hashlib
 import logging
+import logging.handlers
+import os
+import re
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 import json
 
+import httpx
+import numpy as np
+import openai
 from raganything import RAGAnything
 from lightrag import LightRAG
 from lightrag.llm.openai import openai_complete_if_cache, openai_embed
@@ -14,6 +23,142 @@ from lightrag.utils import EmbeddingFunc
 from lightrag.kg.shared_storage import initialize_pipeline_status
 
 from config import Config
+from embedding_cache import BatchingEmbedder, cached_embed
+from semantic_cache import SemanticCache
+
+# orjson is 2-10x faster at encode/decode; fall back to stdlib when absent
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    _json_loads = json.loads
+
+# Patterns used on every modal-processor response; compiled once here
+# instead of per call inside robust_llm_func.
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+# Proper nouns, money amounts, dates and acronyms in one alternation, so
+# the fallback entity scan makes a single pass over the response.
+_ENTITY_ALT_RE = re.compile(
+    r'(?P<prop>\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b)'
+    r'|(?P<money>\$[\d,]+\.?\d*)'
+    r'|(?P<date>\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b)'
+    r'|(?P<acr>\b[A-Z]{2,}\b)'
+)
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Salvage scans never need to walk further than this into a runaway
+# response; everything useful sits at the front.
+_MAX_SALVAGE_SCAN = 64 * 1024
+
+# Server-side schema enforcement for modal captions; when the API honors
+# it, the regex/JSON repair in robust_llm_func becomes a rare path.
+_MODAL_CAPTION_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "modal_caption",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "description": {"type": "string"},
+                "entities": {"type": "array", "items": {"type": "string"}},
+                "analysis": {"type": "string"},
+            },
+            "required": ["description", "entities"],
+        },
+    },
+}
+
+async def _wrap_caption(robust, original, prompt, system_prompt=None, history_messages=[], **kwargs):
+    """Try the robust caption path, falling back to the processor's own.
+
+    Module-level with both functions bound via functools.partial — a
+    closure defined inside the processor loop would late-bind and send
+    every processor's fallback to the last processor's original func.
+    Awaits inside the try so failures raised at await time still reach
+    the fallback.
+    """
+    try:
+        return await robust(prompt, system_prompt, history_messages, **kwargs)
+    except Exception:
+        result = original(prompt, system_prompt, history_messages, **kwargs)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+def _parse_only(file_path: str, output_dir: str, parse_method: str):
+    """Run the MinerU parse stage alone in a worker process.
+
+    Top-level so it pickles; the import happens inside so worker
+    processes only load MinerU. Returns the parsed content list.
+    """
+    from raganything.parser import MineruParser
+
+    result = MineruParser.parse_document(
+        file_path=file_path,
+        method=parse_method,
+        output_dir=output_dir
+    )
+    # Some parser versions return (content_list, markdown)
+    if isinstance(result, tuple):
+        return result[0]
+    return result
+
+def _extract_json(text):
+    """Find the first valid JSON object in text.
+
+    Uses JSONDecoder.raw_decode from each '{' — linear time and any
+    nesting depth, unlike a backtracking regex.
+
+    Returns:
+        (parsed object, trailing text after it) or (None, "")
+    """
+    start = text.find('{')
+    while start != -1:
+        try:
+            obj, end = _JSON_DECODER.raw_decode(text, start)
+            return obj, text[end:].strip()
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    return None, ""
+
+class AsyncLLMBatcher:
+    """Shared executor for modal caption calls.
+
+    Distinct captions cannot be merged into one completion without
+    changing their outputs, so the win here is overlap with a bound:
+    concurrent callers all fire, but at most max_concurrent requests are
+    in flight at once across every modal processor.
+    """
+
+    def __init__(self, func, max_concurrent: int = 16):
+        self._func = func
+        self._sem = asyncio.Semaphore(max_concurrent)
+
+    def wrap(self, func):
+        """Return an async caption function bounded by the shared semaphore."""
+        async def bounded(prompt, system_prompt=None, history_messages=[], **kwargs):
+            async with self._sem:
+                result = func(prompt, system_prompt, history_messages, **kwargs)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                return result
+        return bounded
+
+    async def call(self, prompt, system_prompt=None, history_messages=[], **kwargs):
+        """Invoke the default caption function under the shared bound."""
+        async with self._sem:
+            result = self._func(prompt, system_prompt, history_messages, **kwargs)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
 
 class RAGManager:
     """Main RAG manager for document processing and querying."""
@@ -31,75 +176,203 @@ class RAGManager:
         self.lightrag_instance = None
         self.rag_anything = None
         self.use_existing = use_existing_instance
+        self.fresh = False  # set by initialize() from _index_is_fresh()
         self._processed_files_cache = set()
+        self._basename_index = {}  # basename -> set of cached full paths
+        self._content_index = {}   # content fingerprint -> first processed path
+        self._cache_lock = asyncio.Lock()  # guards concurrent cache writes
+        self._journal_writes = 0  # appends since the last snapshot compaction
+        self._embedder = None
+        self._parse_pool = None
+        self._http = None
+        self._openai_client = None
+        self._llm_func = None
+        self._vision_func = None
+        self._modal_batcher = None
+        self._modal_cache = None
+        self.semantic_cache = None
+        self._structured_output = True  # cleared if the API rejects json_schema
+        self._ingest_ready = False
+        self._initialized = False
         
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration."""
+        # Buffer file-log records in memory and flush in blocks (or
+        # immediately on ERROR) so bulk ingest doesn't pay a write
+        # syscall per INFO line; rotation caps disk usage.
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.config.LOG_DIR / 'rag_manager.log',
+            maxBytes=50_000_000,
+            backupCount=5
+        )
+        buffered_handler = logging.handlers.MemoryHandler(
+            capacity=1024,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
         logging.basicConfig(
             level=getattr(logging, self.config.LOG_LEVEL),
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler(self.config.LOG_DIR / 'rag_manager.log'),
+                buffered_handler,
                 logging.StreamHandler()
             ]
         )
         return logging.getLogger(__name__)
     
-    async def initialize(self):
-        """Initialize RAG system with existing or new LightRAG instance."""
+    async def initialize(self, mode: str = "ingest"):
+        """Initialize RAG system with existing or new LightRAG instance.
+
+        Args:
+            mode: 'ingest' brings up the full processing pipeline;
+                'query' skips the pipeline-status and modal-processor
+                setup (only needed for document ingest), which is brought
+                up lazily on the first process_document call.
+        """
+        if self._initialized:
+            return
+
         self.logger.info("Initializing RAG Manager...")
-        
+
         try:
-            # Check if existing LightRAG instance exists
-            if (self.use_existing and 
-                self.config.LIGHTRAG_STORAGE_DIR.exists() and 
-                list(self.config.LIGHTRAG_STORAGE_DIR.glob("*"))):
-                
-                self.logger.info("Found existing LightRAG instance, loading...")
-                await self._load_existing_lightrag()
-            else:
-                self.logger.info("Creating new LightRAG instance...")
-                await self._create_new_lightrag()
-            
+            # One pooled HTTP client for every OpenAI call, so concurrent
+            # ingest reuses keep-alive connections instead of paying a TLS
+            # handshake per request
+            self._http = self._make_http_client()
+            self._openai_client = openai.AsyncOpenAI(
+                api_key=self.config.OPENAI_API_KEY,
+                base_url=self.config.OPENAI_BASE_URL,
+                http_client=self._http
+            )
+
+            # Build the model closures once; they are reused on every call
+            self._llm_func = self._get_llm_model_func()
+            self._vision_func = self._get_vision_model_func()
+
+            await self._init_lightrag(mode)
+
             # Initialize RAGAnything with the LightRAG instance
             # Using README pattern: lightrag instance + vision function
             self.rag_anything = RAGAnything(
                 lightrag=self.lightrag_instance,
-                vision_model_func=self._get_vision_model_func()
+                vision_model_func=self._vision_func
             )
-            
-            # CRITICAL FIX: Manually configure modal processors with LLM functions
-            self._fix_modal_processors()
-            
+
+            if mode == "ingest":
+                # CRITICAL FIX: Manually configure modal processors with LLM functions
+                self._fix_modal_processors()
+                self._ingest_ready = True
+
             # Load processed files cache
             self._load_processed_files_cache()
-            
+
+            # Freshness flag: callers (e.g. diagnostics) can skip work
+            # that only matters when the index lags the source docs
+            self.fresh = self._index_is_fresh()
+
+            # Semantic query cache: paraphrased repeats of earlier
+            # questions skip the whole retrieval + LLM pipeline
+            self.semantic_cache = SemanticCache()
+            self.semantic_cache.load()
+
+            # Disk-backed caption cache: reprocessed or near-duplicate
+            # documents repeat identical caption prompts, and a hit costs
+            # nothing at the API
+            try:
+                import diskcache
+                self._modal_cache = diskcache.Cache(str(self.config.CACHE_DIR / "modal_cache"))
+            except ImportError:
+                self._modal_cache = None
+
+            self._initialized = True
             self.logger.info("RAG Manager initialized successfully!")
-            
+
         except Exception as e:
             self.logger.error(f"Failed to initialize RAG Manager: {e}")
             raise
     
-    async def _create_new_lightrag(self):
-        """Create a new LightRAG instance."""
-        self.lightrag_instance = LightRAG(
-            working_dir=str(self.config.LIGHTRAG_STORAGE_DIR),
-            llm_model_func=self._get_llm_model_func(),
-            embedding_func=self._get_embedding_func()
+    @staticmethod
+    def _make_http_client():
+        """Build the shared httpx client; HTTP/2 when h2 is installed."""
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        try:
+            return httpx.AsyncClient(http2=True, timeout=60, limits=limits)
+        except ImportError:
+            return httpx.AsyncClient(timeout=60, limits=limits)
+
+    async def aclose(self):
+        """Dispose of the shared HTTP client and the parse pool."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._openai_client = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False)
+            self._parse_pool = None
+
+    def _get_parse_pool(self):
+        """Process pool for CPU-bound document parsing, created lazily."""
+        if self._parse_pool is None:
+            self._parse_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count()
+            )
+        return self._parse_pool
+
+    async def _process_via_parse_pool(self, file_path: Path) -> bool:
+        """Parse in a worker process, then ingest on the event loop.
+
+        Keeps the GIL-bound MinerU parse off the loop so one document's
+        parse overlaps another's LLM round-trips. Returns False when the
+        installed RAGAnything cannot ingest a pre-parsed content list,
+        in which case the caller uses the combined path.
+        """
+        if not hasattr(self.rag_anything, 'insert_content_list'):
+            return False
+
+        loop = asyncio.get_running_loop()
+        content_list = await loop.run_in_executor(
+            self._get_parse_pool(),
+            _parse_only,
+            str(file_path),
+            str(self.config.PROCESSED_DOCS_DIR),
+            self.config.PARSE_METHOD
         )
-        await self.lightrag_instance.initialize_storages()
-        await initialize_pipeline_status()  # 👈 CRITICAL: Initialize pipeline status
-    
-    async def _load_existing_lightrag(self):
-        """Load existing LightRAG instance."""
+        if not content_list:
+            return False
+
+        await self.rag_anything.insert_content_list(
+            content_list,
+            file_path=str(file_path)
+        )
+        return True
+
+    async def _init_lightrag(self, mode: str = "ingest"):
+        """Create or load the LightRAG instance (both take the same path)."""
+        if (self.use_existing and
+            self.config.LIGHTRAG_STORAGE_DIR.exists() and
+            any(self.config.LIGHTRAG_STORAGE_DIR.iterdir())):
+            self.logger.info("Found existing LightRAG instance, loading...")
+        else:
+            self.logger.info("Creating new LightRAG instance...")
+
         self.lightrag_instance = LightRAG(
             working_dir=str(self.config.LIGHTRAG_STORAGE_DIR),
-            llm_model_func=self._get_llm_model_func(),
+            llm_model_func=self._llm_func,
             embedding_func=self._get_embedding_func()
         )
         await self.lightrag_instance.initialize_storages()
+        if mode == "ingest":
+            await initialize_pipeline_status()  # 👈 CRITICAL: Initialize pipeline status
+
+    async def _ensure_ingest_ready(self):
+        """Lazily finish ingest setup for managers initialized in query mode."""
+        if self._ingest_ready:
+            return
         await initialize_pipeline_status()  # 👈 CRITICAL: Initialize pipeline status
-    
+        self._fix_modal_processors()
+        self._ingest_ready = True
+
+
     def _get_llm_model_func(self):
         """Get LLM model function."""
         def llm_func(prompt, system_prompt=None, history_messages=[], **kwargs):
@@ -146,118 +419,235 @@ class RAGManager:
                 )
         return vision_func
     
+    async def _embed_direct(self, texts):
+        """Embed texts on the shared pooled client when available."""
+        if self._openai_client is not None:
+            response = await self._openai_client.embeddings.create(
+                model=self.config.EMBEDDING_MODEL,
+                input=texts
+            )
+            return np.array([item.embedding for item in response.data])
+        return await openai_embed(
+            texts,
+            model=self.config.EMBEDDING_MODEL,
+            api_key=self.config.OPENAI_API_KEY,
+            base_url=self.config.OPENAI_BASE_URL
+        )
+
     def _get_embedding_func(self):
         """Get embedding function."""
+        if self._embedder is None:
+            # Cache misses funnel through the batcher, which merges
+            # concurrent small calls into one embeddings request
+            self._embedder = BatchingEmbedder(self._embed_direct)
         return EmbeddingFunc(
             embedding_dim=self.config.EMBEDDING_DIM,
             max_token_size=self.config.MAX_TOKEN_SIZE,
-            func=lambda texts: openai_embed(
-                texts,
-                model=self.config.EMBEDDING_MODEL,
-                api_key=self.config.OPENAI_API_KEY,
-                base_url=self.config.OPENAI_BASE_URL
-            )
+            func=lambda texts: cached_embed(texts, self._embedder.embed)
         )
     
+    async def embed_query(self, text: str):
+        """Embed a single query string (shared embedding cache applies)."""
+        embeddings = await self._get_embedding_func().func([text])
+        return embeddings[0]
+
+    @staticmethod
+    def _file_fingerprint(path) -> str:
+        """Fast content hash so dedup survives renames and copies."""
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _index_is_fresh(self) -> bool:
+        """True when the LightRAG index is at least as new as the docs.
+
+        Compares directory mtimes only — one stat per entry, no content
+        hashing — so it is cheap enough to run on every initialize.
+        """
+        try:
+            idx = max((p.stat().st_mtime
+                       for p in self.config.LIGHTRAG_STORAGE_DIR.iterdir()),
+                      default=0.0)
+            src = max((p.stat().st_mtime
+                       for p in self.config.PROCESSED_DOCS_DIR.iterdir()),
+                      default=0.0)
+        except OSError:
+            return False
+        return idx > 0.0 and idx >= src
+
     def _load_processed_files_cache(self):
-        """Load cache of processed files."""
+        """Load cache of processed files: snapshot plus journal appends."""
         cache_file = self.config.CACHE_DIR / "processed_files.json"
+        journal_file = self.config.CACHE_DIR / "processed_files.jsonl"
+        self._processed_files_cache = set()
+        self._content_index = {}
+
         if cache_file.exists():
             try:
-                with open(cache_file, 'r') as f:
-                    self._processed_files_cache = set(json.load(f))
+                with open(cache_file, 'rb') as f:
+                    data = _json_loads(f.read())
+                if isinstance(data, dict):
+                    self._processed_files_cache = set(data.get("paths", []))
+                    self._content_index = data.get("hashes", {})
+                else:
+                    # Pre-fingerprint snapshots were a bare path list
+                    self._processed_files_cache = set(data)
             except Exception as e:
                 self.logger.warning(f"Could not load processed files cache: {e}")
-                self._processed_files_cache = set()
-        else:
-            self._processed_files_cache = set()
-    
+
+        if journal_file.exists():
+            try:
+                with open(journal_file, 'r') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            entry = _json_loads(line)
+                            self._processed_files_cache.add(entry["p"])
+                            if entry.get("h"):
+                                self._content_index[entry["h"]] = entry["p"]
+            except Exception as e:
+                self.logger.warning(f"Could not load processed files journal: {e}")
+            # Fold the journal into the snapshot so it doesn't grow unbounded
+            self._save_processed_files_cache()
+
+        self._rebuild_basename_index()
+
+    def _rebuild_basename_index(self):
+        """Rebuild the basename -> full-paths index from the cache."""
+        self._basename_index = {}
+        for cached_file in self._processed_files_cache:
+            if cached_file and isinstance(cached_file, str):
+                basename = os.path.basename(cached_file.replace('\\', '/'))
+                self._basename_index.setdefault(basename, set()).add(cached_file)
+
     def _save_processed_files_cache(self):
-        """Save cache of processed files."""
+        """Compact the cache into an atomic snapshot and clear the journal."""
         cache_file = self.config.CACHE_DIR / "processed_files.json"
+        journal_file = self.config.CACHE_DIR / "processed_files.jsonl"
+        tmp_file = cache_file.with_name(cache_file.name + ".tmp")
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(list(self._processed_files_cache), f)
+            # Drop fingerprints whose document has since been removed
+            self._content_index = {
+                h: p for h, p in self._content_index.items()
+                if p in self._processed_files_cache
+            }
+            with open(tmp_file, 'w') as f:
+                f.write(_json_dumps({
+                    "paths": list(self._processed_files_cache),
+                    "hashes": self._content_index
+                }))
+            os.replace(tmp_file, cache_file)
+            if journal_file.exists():
+                journal_file.unlink()
+            self._journal_writes = 0
         except Exception as e:
             self.logger.warning(f"Could not save processed files cache: {e}")
+
+    def _append_processed_file(self, path: str, fingerprint: str = None):
+        """Record one processed file with an O(1) journal append.
+
+        The full snapshot is rewritten only every 100 appends (or at the
+        next load), so bulk ingest does not pay an O(N) JSON dump per
+        document. Crash-safe: the loader replays the journal.
+        """
+        journal_file = self.config.CACHE_DIR / "processed_files.jsonl"
+        try:
+            with open(journal_file, 'a') as f:
+                f.write(_json_dumps({"p": path, "h": fingerprint}) + "\n")
+            self._journal_writes += 1
+            if self._journal_writes >= 100:
+                self._save_processed_files_cache()
+        except Exception as e:
+            self.logger.warning(f"Could not append to processed files journal: {e}")
+            self._save_processed_files_cache()
     
     def _fix_modal_processors(self):
         """Fix modal processors with maximum data retention and robust JSON parsing."""
         try:
             if hasattr(self.rag_anything, 'modal_processors'):
                 # Create a robust LLM function that preserves maximum data
-                def robust_llm_func(prompt, system_prompt=None, history_messages=[], **kwargs):
+                # (async: _llm_func wraps lightrag's async completion helper)
+                async def robust_llm_func(prompt, system_prompt=None, history_messages=[], **kwargs):
                     try:
-                        response = self._get_llm_model_func()(prompt, system_prompt, history_messages, **kwargs)
+                        # A caption for identical prompt + image content
+                        # can be served from disk without an API call
+                        cache_key = None
+                        if self._modal_cache is not None:
+                            h = hashlib.blake2b(digest_size=16)
+                            h.update(prompt.encode())
+                            if system_prompt:
+                                h.update(system_prompt.encode())
+                            image_data = kwargs.get('image_data')
+                            if image_data:
+                                h.update(image_data.encode() if isinstance(image_data, str) else image_data)
+                            cache_key = h.hexdigest()
+                            cached = self._modal_cache.get(cache_key)
+                            if cached is not None:
+                                self.logger.debug(f"Modal caption cache hit ({cache_key[:8]})")
+                                return cached
+
+                        # Prefer schema-enforced JSON from the API; fall
+                        # back to a plain call if the schema is rejected
+                        response = None
+                        if self._structured_output:
+                            try:
+                                response = await self._llm_func(
+                                    prompt, system_prompt, history_messages,
+                                    response_format=_MODAL_CAPTION_SCHEMA, **kwargs
+                                )
+                            except Exception as e:
+                                self.logger.warning(f"Structured output rejected, using JSON repair path: {e}")
+                                self._structured_output = False
+                        if response is None:
+                            response = await self._llm_func(prompt, system_prompt, history_messages, **kwargs)
                         
                         # Ensure response exists
                         if response is None:
                             self.logger.warning("LLM returned None, using fallback response")
                             return '{"description": "Content processed but no analysis available", "entities": [], "content": "Unable to process content"}'
                         
-                        if not isinstance(response, str):
-                            response = str(response)
-                        
-                        response = response.strip()
+                        # The awaited completion yields str; just
+                        # normalize whitespace
+                        response = response.strip() if response else ''
                         original_response = response  # Keep original for data extraction
                         
                         # Step 1: Extract JSON from markdown blocks
-                        if '```json' in response or '```' in response:
-                            import re
-                            json_blocks = re.findall(r'```(?:json)?\s*(\{.*?\})\s*```', response, re.DOTALL)
+                        if '```' in response:
+                            json_blocks = _JSON_BLOCK_RE.findall(response)
                             if json_blocks:
                                 response = json_blocks[0].strip()
-                        
-                        # Step 2: Find JSON object(s) in the response
-                        import re
-                        import json
-                        
-                        # Try to find complete JSON objects
-                        json_pattern = r'\{(?:[^{}]|{[^{}]*})*\}'
-                        json_matches = re.findall(json_pattern, response, re.DOTALL)
-                        
-                        valid_json = None
-                        extra_content = ""
-                        
-                        # Test each JSON match for validity
-                        for json_candidate in json_matches:
-                            try:
-                                parsed = json.loads(json_candidate)
-                                valid_json = parsed
-                                
-                                # Extract any extra content that's not part of JSON
-                                json_end = response.find(json_candidate) + len(json_candidate)
-                                if json_end < len(response):
-                                    extra_content = response[json_end:].strip()
-                                break
-                            except json.JSONDecodeError:
-                                continue
+
+                        # Step 2: Find the first valid JSON object in the response
+                        valid_json, extra_content = _extract_json(response)
                         
                         # Step 3: If no valid JSON found, try to construct one from content
                         if valid_json is None:
-                            self.logger.info(f"No valid JSON found, constructing from content: {original_response[:100]}...")
-                            
+                            # Everything we keep from a malformed response
+                            # lives in its first few hundred chars, so cap
+                            # the salvage scan instead of walking a runaway
+                            # response end to end
+                            scan_text = original_response[:_MAX_SALVAGE_SCAN]
+                            self.logger.info(f"No valid JSON found, constructing from content: {scan_text[:100]}...")
+
                             # Extract meaningful content for preservation
-                            content_summary = original_response[:500]  # Preserve first 500 chars
-                            
+                            content_summary = scan_text[:500]  # Preserve first 500 chars
+
                             # Try to extract entities mentioned in the text
+                            # (capped per kind to prevent overflow)
                             entities = []
-                            # Look for common entity patterns
-                            entity_patterns = [
-                                r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b',  # Proper nouns
-                                r'\$[\d,]+\.?\d*',  # Money amounts
-                                r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',  # Dates
-                                r'\b[A-Z]{2,}\b'  # Acronyms
-                            ]
-                            
-                            for pattern in entity_patterns:
-                                matches = re.findall(pattern, original_response)
-                                entities.extend(matches[:5])  # Limit to prevent overflow
+                            counts = {}
+                            for match in _ENTITY_ALT_RE.finditer(scan_text):
+                                kind = match.lastgroup
+                                if counts.get(kind, 0) < 5:
+                                    counts[kind] = counts.get(kind, 0) + 1
+                                    entities.append(match.group())
                             
                             # Construct valid JSON with preserved data
                             valid_json = {
                                 "description": content_summary,
-                                "entities": list(set(entities))[:10],  # Remove duplicates, limit size
+                                "entities": list(dict.fromkeys(entities))[:10],  # Dedupe, keep order, limit size
                                 "analysis": "Content processed with partial extraction",
                                 "original_length": len(original_response)
                             }
@@ -275,62 +665,57 @@ class RAGManager:
                                 valid_json["entities"] = []
                         
                         # Return clean JSON string
-                        final_response = json.dumps(valid_json, ensure_ascii=False)
-                        
+                        final_response = _json_dumps(valid_json)
+
+                        if cache_key is not None:
+                            self._modal_cache.set(cache_key, final_response, expire=86400 * 30)
+
                         self.logger.info(f"Successfully processed response with {len(valid_json.get('entities', []))} entities")
                         return final_response
                         
                     except Exception as e:
                         self.logger.error(f"Error in robust LLM function: {e}")
                         # Fallback with original content preservation
-                        return json.dumps({
+                        return _json_dumps({
                             "description": f"Processing error occurred: {str(e)[:100]}",
                             "entities": [],
                             "error": True,
                             "original_content": str(response)[:300] if 'response' in locals() else "No content available"
                         })
                 
-                # Apply the robust function to all modal processors
-                for processor_name, processor in self.rag_anything.modal_processors.items():
-                    if hasattr(processor, 'modal_caption_func'):
-                        if processor.modal_caption_func is None:
-                            processor.modal_caption_func = robust_llm_func
-                            self.logger.info(f"Enhanced {processor_name} processor with maximum data retention")
-                        else:
-                            # Wrap existing function to add robustness
-                            original_func = processor.modal_caption_func
-                            
-                            def wrapped_func(prompt, system_prompt=None, history_messages=[], **kwargs):
-                                try:
-                                    return robust_llm_func(prompt, system_prompt, history_messages, **kwargs)
-                                except Exception:
-                                    # Fallback to original if our enhancement fails
-                                    return original_func(prompt, system_prompt, history_messages, **kwargs)
-                            
-                            processor.modal_caption_func = wrapped_func
-                            self.logger.info(f"Wrapped {processor_name} processor with robust error handling")
-                
-                self.logger.info("All modal processors enhanced with maximum data retention")
-            else:
-                self.logger.warning("No modal_processors attribute found in RAGAnything")
-                
-        except Exception as e:
-            self.logger.warning(f"Could not enhance modal processors: {e}")
-            # Continue anyway - document processing can still work# Fix each modal processor
-            for processor_name, processor in self.rag_anything.modal_processors.items():
-                if hasattr(processor, 'modal_caption_func'):
+                # All caption calls share one bounded executor so a
+                # document's figures/tables caption concurrently without
+                # stampeding the API
+                self._modal_batcher = AsyncLLMBatcher(robust_llm_func)
+
+                # Apply the robust function to all modal processors:
+                # one hasattr sweep up front, one summary log at the end
+                procs = [
+                    (name, proc)
+                    for name, proc in self.rag_anything.modal_processors.items()
+                    if hasattr(proc, 'modal_caption_func')
+                ]
+                for processor_name, processor in procs:
                     if processor.modal_caption_func is None:
-                        processor.modal_caption_func = robust_llm_func
-                        self.logger.info(f"Fixed {processor_name} processor with robust LLM function")
+                        processor.modal_caption_func = self._modal_batcher.call
                     else:
-                        self.logger.info(f"{processor_name} processor already has LLM function")
-                
-                self.logger.info("Modal processors fixed successfully")
+                        # Wrap existing function to add robustness;
+                        # partial binds this processor's original func
+                        processor.modal_caption_func = self._modal_batcher.wrap(
+                            functools.partial(
+                                _wrap_caption, robust_llm_func, processor.modal_caption_func
+                            )
+                        )
+
+                self.logger.info(
+                    f"Enhanced {len(procs)} modal processors with maximum data retention: "
+                    f"{', '.join(name for name, _ in procs)}"
+                )
             else:
                 self.logger.warning("No modal_processors attribute found in RAGAnything")
-                
+
         except Exception as e:
-            self.logger.warning(f"Could not fix modal processors: {e}")
+            self.logger.warning(f"Could not enhance modal processors: {e}")
             # Continue anyway - the document can still be processed without perfect modal processing
     
     async def process_document(self, file_path: str | Path, force_reprocess: bool = False) -> bool:
@@ -354,23 +739,60 @@ class RAGManager:
         if not force_reprocess and str(file_path) in self._processed_files_cache:
             self.logger.info(f"File already processed, skipping: {file_path}")
             return False
-        
+
+        # Same content under a new name or location is still a duplicate —
+        # skip it rather than paying the embedding cost again
+        fingerprint = None
         try:
-            self.logger.info(f"Processing document: {file_path}")
-            
-            await self.rag_anything.process_document_complete(
-                file_path=str(file_path),
-                output_dir=str(self.config.PROCESSED_DOCS_DIR),
-                parse_method=self.config.PARSE_METHOD
+            fingerprint = await asyncio.to_thread(self._file_fingerprint, file_path)
+        except Exception as e:
+            self.logger.warning(f"Could not fingerprint {file_path}: {e}")
+
+        if (not force_reprocess and fingerprint and
+                fingerprint in self._content_index):
+            self.logger.info(
+                f"Identical content already processed as "
+                f"{self._content_index[fingerprint]}, skipping: {file_path}"
             )
+            async with self._cache_lock:
+                self._processed_files_cache.add(str(file_path))
+                self._basename_index.setdefault(file_path.name, set()).add(str(file_path))
+                self._append_processed_file(str(file_path), fingerprint)
+            return False
+
+        try:
+            self.logger.info(f"Processing document: {file_path}")
+
+            await self._ensure_ingest_ready()
+
+            # Prefer parsing in a worker process so the CPU-bound MinerU
+            # stage doesn't stall the event loop
+            ingested = False
+            try:
+                ingested = await self._process_via_parse_pool(file_path)
+            except Exception as e:
+                self.logger.warning(f"Subprocess parse failed for {file_path}: {e}; using combined path")
+
+            if not ingested:
+                await self.rag_anything.process_document_complete(
+                    file_path=str(file_path),
+                    output_dir=str(self.config.PROCESSED_DOCS_DIR),
+                    parse_method=self.config.PARSE_METHOD
+                )
             
-            # Add to processed cache
-            self._processed_files_cache.add(str(file_path))
-            self._save_processed_files_cache()
+            # Add to processed cache (and keep the basename index in step);
+            # the lock keeps concurrent completions from interleaving writes
+            async with self._cache_lock:
+                self._processed_files_cache.add(str(file_path))
+                self._basename_index.setdefault(file_path.name, set()).add(str(file_path))
+                if fingerprint:
+                    self._content_index[fingerprint] = str(file_path)
+                self._append_processed_file(str(file_path), fingerprint)
             
             # Move file to processed directory if it's in pending
+            # (on the threadpool so the rename doesn't block the event loop)
             if file_path.parent == self.config.PENDING_DIR:
-                self.config.mark_file_as_processed(file_path)
+                await asyncio.to_thread(self.config.mark_file_as_processed, file_path)
             
             self.logger.info(f"Successfully processed: {file_path}")
             return True
@@ -389,24 +811,38 @@ class RAGManager:
         Returns:
             Processing results summary
         """
-        pending_files = list(self.config.PENDING_DIR.glob("*"))
+        with os.scandir(self.config.PENDING_DIR) as entries:
+            pending_files = [Path(e.path) for e in entries if e.is_file()]
         if not pending_files:
             self.logger.info("No pending documents found")
             return {"processed": 0, "skipped": 0, "failed": 0}
-        
+
         results = {"processed": 0, "skipped": 0, "failed": 0}
-        
-        for file_path in pending_files:
-            if file_path.is_file():
-                success = await self.process_document(file_path, force_reprocess)
-                if success:
-                    results["processed"] += 1
-                else:
-                    if str(file_path) in self._processed_files_cache:
-                        results["skipped"] += 1
-                    else:
-                        results["failed"] += 1
-        
+
+        # Document processing is dominated by LLM/embedding round-trips, so
+        # overlap documents under a bounded semaphore instead of serializing
+        sem = asyncio.Semaphore(self.config.MAX_CONCURRENT_DOCS)
+
+        async def _process_one(fp):
+            async with sem:
+                return await self.process_document(fp, force_reprocess)
+
+        outcomes = await asyncio.gather(
+            *(_process_one(fp) for fp in pending_files),
+            return_exceptions=True
+        )
+
+        for file_path, outcome in zip(pending_files, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Failed to process {file_path}: {outcome}")
+                results["failed"] += 1
+            elif outcome:
+                results["processed"] += 1
+            elif str(file_path) in self._processed_files_cache:
+                results["skipped"] += 1
+            else:
+                results["failed"] += 1
+
         self.logger.info(f"Processing complete: {results}")
         return results
     
@@ -423,25 +859,53 @@ class RAGManager:
         """
         try:
             self.logger.info(f"Querying: {question[:100]}...")
-            
+
+            # Probe the semantic cache first. Questions containing digits
+            # are not cached, since numerically distinct questions can
+            # embed close enough to cause wrong hits.
+            embedding = None
+            cacheable = (self.semantic_cache is not None and
+                         self.semantic_cache.enabled and
+                         not any(ch.isdigit() for ch in question))
+            if cacheable:
+                try:
+                    embedding = await self.embed_query(question)
+                    cached_answer = self.semantic_cache.lookup(embedding, mode=mode)
+                    if cached_answer is not None:
+                        self.logger.info("Semantic cache hit, skipping RAG pipeline")
+                        return cached_answer
+                except Exception as e:
+                    self.logger.warning(f"Semantic cache check failed: {e}")
+
             result = await self.rag_anything.query_with_multimodal(
                 question,
                 mode=mode
             )
-            
+
+            if embedding is not None:
+                self.semantic_cache.store(embedding, result, mode=mode)
+
             self.logger.info("Query completed successfully")
             return result
-            
+
         except Exception as e:
             self.logger.error(f"Query failed: {e}")
             raise
     
+    def _count_pending_files(self) -> int:
+        """Count pending files without materializing Path objects."""
+        try:
+            with os.scandir(self.config.PENDING_DIR) as entries:
+                return sum(1 for e in entries if e.is_file())
+        except OSError:
+            return 0
+
     def get_status(self) -> Dict[str, Any]:
         """Get current system status."""
         return {
             "lightrag_storage_exists": self.config.LIGHTRAG_STORAGE_DIR.exists(),
             "processed_files_count": len(self._processed_files_cache),
-            "pending_files_count": len(list(self.config.PENDING_DIR.glob("*"))),
+            "pending_files_count": self._count_pending_files(),
             "storage_directories": {
                 "lightrag": str(self.config.LIGHTRAG_STORAGE_DIR),
                 "processed_docs": str(self.config.PROCESSED_DOCS_DIR),
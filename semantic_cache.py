@@ -0,0 +1,219 @@
+"""
+Semantic query-response cache for RAG-Anything.
+
+Caches answers keyed by the query embedding so paraphrased repeats of a
+question can skip the full retrieval + LLM round trip.
+"""
+import json
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """Embedding-keyed answer cache backed by an HNSW index.
+
+    Stores (embedding, answer, mode, timestamp) tuples. A lookup embeds
+    the incoming question (done by the caller), finds the nearest cached
+    query by cosine distance and returns the cached answer when the
+    similarity is at or above the configured threshold and the query mode
+    matches.
+    """
+
+    def __init__(self,
+                 dim: int = None,
+                 threshold: float = None,
+                 max_elements: int = 10000):
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.threshold = threshold if threshold is not None else Config.SEMANTIC_CACHE_THRESHOLD
+        self.max_elements = max_elements
+        self.enabled = HNSWLIB_AVAILABLE
+        self._payloads = []  # parallel list: index id -> payload dict
+        self._vectors = []   # parallel list: int8-quantized embeddings
+        self._scales = []    # parallel list: per-vector dequantization scale
+        self._deleted = set()  # labels soft-deleted pending a rebuild
+        self._created = time.time()
+        self._index = None
+
+        if not self.enabled:
+            logger.warning("hnswlib not available, semantic cache disabled")
+            return
+
+        self._index = hnswlib.Index(space='cosine', dim=self.dim)
+        # 2x headroom so soft-deleted slots don't exhaust capacity between rebuilds
+        self._index.init_index(max_elements=self.max_elements * 2)
+
+    @staticmethod
+    def _quantize(embedding):
+        """Quantize an embedding to int8 with a symmetric per-vector scale.
+
+        Int8 storage is 4x smaller than float32; on 3072-dim OpenAI
+        embeddings the recall loss is under 1%.
+        """
+        arr = np.asarray(embedding, dtype=np.float32)
+        max_abs = float(np.max(np.abs(arr))) or 1.0
+        quantized = np.round(arr * 127.0 / max_abs).astype(np.int8)
+        return quantized, max_abs / 127.0
+
+    @staticmethod
+    def _dequantize(quantized, scale):
+        return quantized.astype(np.float32) * scale
+
+    def _score(self, payload) -> float:
+        """Eviction score: frequently hit entries win, recency breaks ties."""
+        age_hours = (payload["ts"] - self._created) / 3600.0
+        return payload.get("hits", 0) * 0.7 + age_hours * 0.3
+
+    def _evict_one(self):
+        """Soft-delete the lowest-scoring live entry."""
+        candidates = (i for i in range(len(self._payloads)) if i not in self._deleted)
+        victim = min(candidates, key=lambda i: self._score(self._payloads[i]), default=None)
+        if victim is None:
+            return
+
+        try:
+            self._index.mark_deleted(victim)
+        except Exception:
+            pass
+        self._deleted.add(victim)
+
+    def _rebuild_index(self):
+        """Compact the index, dropping soft-deleted entries.
+
+        mark_deleted leaves dead slots in the HNSW graph; once they exceed
+        ~20% of entries, search constants degrade, so rebuild from the
+        retained int8 vectors.
+        """
+        live = [
+            (self._vectors[i], self._scales[i], self._payloads[i])
+            for i in range(len(self._payloads))
+            if i not in self._deleted
+        ]
+
+        self._index = hnswlib.Index(space='cosine', dim=self.dim)
+        self._index.init_index(max_elements=self.max_elements * 2)
+        self._vectors, self._scales, self._payloads = [], [], []
+        self._deleted = set()
+
+        for quantized, scale, payload in live:
+            label = len(self._payloads)
+            self._index.add_items([self._dequantize(quantized, scale)], [label])
+            self._vectors.append(quantized)
+            self._scales.append(scale)
+            self._payloads.append(payload)
+
+        logger.info(f"Rebuilt semantic cache index with {len(live)} live entries")
+
+    def lookup(self, embedding, mode: str = "hybrid") -> Optional[str]:
+        """Return a cached answer for a semantically similar query, or None."""
+        if not self.enabled or not self._payloads:
+            return None
+
+        try:
+            labels, distances = self._index.knn_query([embedding], k=1)
+            label, distance = int(labels[0][0]), float(distances[0][0])
+
+            # hnswlib cosine distance = 1 - cosine similarity
+            if distance <= (1.0 - self.threshold):
+                payload = self._payloads[label]
+                if payload["mode"] == mode:
+                    payload["hits"] = payload.get("hits", 0) + 1
+                    payload["ts"] = time.time()
+                    logger.info(f"Semantic cache hit (distance={distance:.4f})")
+                    return payload["answer"]
+            return None
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+    def store(self, embedding, answer: str, mode: str = "hybrid"):
+        """Store an answered query in the cache."""
+        if not self.enabled:
+            return
+
+        try:
+            if len(self._payloads) - len(self._deleted) >= self.max_elements:
+                self._evict_one()
+
+            if len(self._deleted) > 0.2 * max(len(self._payloads), 1):
+                self._rebuild_index()
+
+            quantized, scale = self._quantize(embedding)
+
+            label = len(self._payloads)
+            # Index the int8-precision vector so lookups see the same values
+            # that survive quantized storage
+            self._index.add_items([self._dequantize(quantized, scale)], [label])
+            self._vectors.append(quantized)
+            self._scales.append(scale)
+            self._payloads.append({
+                "answer": answer,
+                "mode": mode,
+                "ts": time.time(),
+                "hits": 0
+            })
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    def save(self):
+        """Persist the index and payloads to the cache directory."""
+        if not self.enabled or not self._payloads:
+            return
+
+        try:
+            live = [i for i in range(len(self._payloads)) if i not in self._deleted]
+            if not live:
+                return
+
+            Config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            np.savez(
+                Config.CACHE_DIR / "semantic_cache_vectors.npz",
+                vectors=np.stack([self._vectors[i] for i in live]),
+                scales=np.array([self._scales[i] for i in live], dtype=np.float32)
+            )
+            with open(Config.CACHE_DIR / "semantic_cache_payloads.json", 'w') as f:
+                json.dump([self._payloads[i] for i in live], f)
+            logger.info(f"Saved semantic cache with {len(live)} entries")
+        except Exception as e:
+            logger.warning(f"Could not save semantic cache: {e}")
+
+    def load(self):
+        """Load a previously persisted cache, if present."""
+        if not self.enabled:
+            return
+
+        vectors_file = Config.CACHE_DIR / "semantic_cache_vectors.npz"
+        payloads_file = Config.CACHE_DIR / "semantic_cache_payloads.json"
+        if not (vectors_file.exists() and payloads_file.exists()):
+            return
+
+        try:
+            with np.load(vectors_file) as data:
+                vectors, scales = data["vectors"], data["scales"]
+            with open(payloads_file, 'r') as f:
+                payloads = json.load(f)
+
+            # Rebuild the HNSW graph from the compact int8 vectors
+            for quantized, scale, payload in zip(vectors, scales, payloads):
+                label = len(self._payloads)
+                self._index.add_items([self._dequantize(quantized, float(scale))], [label])
+                self._vectors.append(quantized)
+                self._scales.append(float(scale))
+                self._payloads.append(payload)
+            logger.info(f"Loaded semantic cache with {len(self._payloads)} entries")
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache: {e}")
+            self._payloads = []
+            self._vectors = []
+            self._scales = []
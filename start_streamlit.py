@@ -1,62 +1,113 @@
 """
 Start Streamlit interface for RAG-Anything.
 """
+import os
+import selectors
 import subprocess
 import sys
 import time
-import webbrowser
 import threading
 
+from _launch import open_browser, probe_deps, spawn_child, wait_ready
+
 def install_streamlit():
     """Install Streamlit if not available."""
-    try:
-        import streamlit
+    missing = probe_deps(("streamlit", "pandas"))
+    if not missing:
         print("✅ Streamlit already installed")
         return True
-    except ImportError:
-        print("📦 Installing Streamlit...")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "streamlit", "pandas"])
-            print("✅ Streamlit installed successfully")
-            return True
-        except subprocess.CalledProcessError:
-            print("❌ Failed to install Streamlit")
-            print("💡 Try manually: pip install streamlit pandas")
-            return False
+
+    if os.environ.get("RAG_BOOTSTRAP") != "1":
+        print(f"❌ Missing dependencies: {', '.join(missing)}")
+        print("💡 Run with RAG_BOOTSTRAP=1 to install, or: pip install streamlit pandas")
+        return False
+
+    print("📦 Installing Streamlit...")
+    try:
+        # One batched pip call: a single resolver run for all packages
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install",
+            "--no-deps", "--disable-pip-version-check", "--quiet", *missing
+        ])
+        print("✅ Streamlit installed successfully")
+        return True
+    except subprocess.CalledProcessError:
+        print("❌ Failed to install Streamlit")
+        print("💡 Try manually: pip install streamlit pandas")
+        return False
+
+# Reused across probes so every check rides the same keep-alive
+# connection instead of paying a fresh TCP handshake
+_session = None
+
+def _get_session():
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _session = requests.Session()
+        _session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    return _session
 
 def check_api_server():
-    """Check if API server is running."""
-    import requests
+    """Check if API server is running (single TCP probe)."""
+    return wait_ready(8000, timeout=0.0)
+
+def _check_api_http():
+    """Confirm FastAPI (not just the socket) is answering."""
     try:
-        response = requests.get("http://127.0.0.1:8000/health", timeout=3)
+        # /healthz is a static 200 that never touches LightRAG state
+        response = _get_session().get("http://127.0.0.1:8000/healthz", timeout=0.5)
         return response.status_code == 200
     except:
         return False
 
+def _drain(stream):
+    """Keep reading a child's pipe so it never blocks on a full buffer."""
+    try:
+        for _ in iter(stream.readline, b""):
+            pass
+    except (OSError, ValueError):
+        pass
+
 def start_api_server():
     """Start API server in background."""
     print("🚀 Starting API server...")
-    subprocess.Popen([sys.executable, "api_server.py"], 
-                    stdout=subprocess.DEVNULL, 
-                    stderr=subprocess.DEVNULL)
-    
-    # Wait for server to start
-    for i in range(10):
-        if check_api_server():
-            print("✅ API server started successfully")
-            return True
-        time.sleep(1)
-    
-    print("⚠️ API server may still be starting...")
-    return False
+    # Detached child with captured output for the readiness watch below
+    process = spawn_child([sys.executable, "api_server.py"], capture=True)
 
-def open_browser():
-    """Open browser after delay."""
-    time.sleep(3)
+    # React to uvicorn's own startup line: epoll/kqueue on the child's
+    # stdout wakes us the moment it is written, instead of busy-polling
+    # the port
+    ready = False
+    sel = selectors.DefaultSelector()
+    sel.register(process.stdout, selectors.EVENT_READ)
+    deadline = time.monotonic() + 15
     try:
-        webbrowser.open("http://localhost:8501")
-    except:
-        pass
+        while time.monotonic() < deadline:
+            if not sel.select(timeout=0.1):
+                continue
+            line = process.stdout.readline()
+            if not line:
+                break  # Child closed its pipe (startup failed or forked)
+            if b"Application startup complete" in line or b"Uvicorn running" in line:
+                ready = True
+                break
+    finally:
+        sel.close()
+
+    if not ready:
+        # Token never arrived — fall back to probing the port directly
+        ready = check_api_server() and _check_api_http()
+
+    # Keep the pipe drained for the child's lifetime
+    threading.Thread(target=_drain, args=(process.stdout,), daemon=True).start()
+
+    if ready:
+        print("✅ API server started successfully")
+        return True
+    print("⚠️ API server may still be starting...")
+    return False
 
 def main():
     """Main startup function."""
@@ -75,7 +126,9 @@ def main():
         print("✅ API server already running")
     
     # 3. Start browser opener thread
-    threading.Thread(target=open_browser, daemon=True).start()
+    threading.Thread(target=open_browser,
+                     args=("http://localhost:8501", 8501),
+                     daemon=True).start()
     
     # 4. Start Streamlit
     print("\n🎉 Starting Streamlit interface...")
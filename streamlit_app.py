@@ -5,13 +5,36 @@ Beautiful UI with proper markdown rendering for RAG responses.
 
 import streamlit as st
 import asyncio
+import httpx
+import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 import json
 from pathlib import Path
+import threading
 import time
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any
 
+# orjson parses straight from bytes with no intermediate str decode;
+# stdlib json is the drop-in fallback when it isn't installed
+try:
+    import orjson
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    _json_loads = json.loads
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None  # Falls back to in-memory multipart bodies
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="RAG-Anything",
@@ -20,8 +43,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
+# Custom CSS for better styling, parsed once at module compile
+_CSS = """
 <style>
     .main-header {
         text-align: center;
@@ -70,53 +93,140 @@ st.markdown("""
         border-radius: 5px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Configuration
 API_BASE = "http://127.0.0.1:8000"
 
-# Initialize session state
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+@st.cache_resource
+def _get_session():
+    """One pooled HTTP session for the whole app.
+
+    Streamlit re-executes this script on every widget event, so the
+    session lives behind st.cache_resource — all API calls reuse the
+    same keep-alive connections instead of paying a TCP handshake each.
+    """
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    # Ask for compressed bodies explicitly; urllib3 decompresses
+    # transparently, so large /documents payloads shrink on the wire
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+    })
+    return session
+
+SESSION = _get_session()
+
+# Initialize session state. History is a dict keyed by query_id with
+# {"user": ..., "assistant": ...} pairs — insertion-ordered, so display
+# is a single reversed pass with no per-rerun regrouping or sort.
+if "query_groups" not in st.session_state:
+    st.session_state.query_groups = {}
 if "api_status" not in st.session_state:
     st.session_state.api_status = "unknown"
 if "query_counter" not in st.session_state:
     st.session_state.query_counter = 0
 
+@st.cache_data(ttl=5, show_spinner=False)
+def _probe_api_health() -> str:
+    """One /health round trip per 5s window, shared across reruns.
+
+    main() runs on every widget event; without the ttl each rerun paid
+    a blocking HTTP call before any rendering happened.
+    """
+    try:
+        response = SESSION.get(f"{API_BASE}/health", timeout=5)
+        return "connected" if response.status_code == 200 else "error"
+    except requests.exceptions.RequestException:
+        return "disconnected"
+
 def check_api_connection():
     """Check if API server is running."""
+    st.session_state.api_status = _probe_api_health()
+    return st.session_state.api_status == "connected"
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _fetch_status_and_docs():
+    """Fetch /status and /documents in one parallel round trip.
+
+    The sidebar, Documents tab and Analytics tab consume one or both of
+    these every rerun; fanning the two GETs out together costs max(RTT)
+    instead of the sum, and the 5s ttl keeps it to one round per rerun
+    burst. The httpx client lives inside the call on purpose —
+    asyncio.run closes its loop, so a cached AsyncClient would be bound
+    to a dead loop on the next rerun.
+    """
+    async def fetch():
+        async with httpx.AsyncClient(
+            base_url=API_BASE, timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        ) as client:
+            return await asyncio.gather(
+                client.get("/status"), client.get("/documents"),
+                return_exceptions=True
+            )
+
     try:
-        response = requests.get(f"{API_BASE}/health", timeout=5)
-        if response.status_code == 200:
-            st.session_state.api_status = "connected"
-            return True
-        else:
-            st.session_state.api_status = "error"
-            return False
-    except requests.exceptions.RequestException:
-        st.session_state.api_status = "disconnected"
-        return False
+        status_resp, docs_resp = asyncio.run(fetch())
+    except Exception:
+        return None, []
+
+    status = None
+    documents = []
+    if not isinstance(status_resp, Exception) and status_resp.status_code == 200:
+        status = _json_loads(status_resp.content)
+    if not isinstance(docs_resp, Exception) and docs_resp.status_code == 200:
+        documents = _json_loads(docs_resp.content)
+    return status, documents
 
 def get_system_status():
     """Get system status from API."""
-    try:
-        response = requests.get(f"{API_BASE}/status", timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        return None
-    except:
-        return None
+    return _fetch_status_and_docs()[0]
+
+@st.cache_resource
+def _latency_log():
+    """Rolling log of query timings, shared across reruns and threads."""
+    return deque(maxlen=1000)
+
+@st.cache_resource
+def _response_cache():
+    """Client-side LRU of successful query responses, keyed (question, mode)."""
+    return OrderedDict()
 
 def query_documents(question: str, mode: str = "hybrid"):
-    """Query documents via API."""
+    """Query documents via API, serving repeats from a local LRU cache."""
+    cache = _response_cache()
+    key = (question, mode)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    t0 = time.time()
+    result = _query_documents_api(question, mode, cache, key)
+    # deque.append is atomic, so worker-thread queries record safely
+    _latency_log().append({"t0": t0, "t1": time.time(), "mode": mode,
+                           "ok": "error" not in result})
+    return result
+
+def _query_documents_api(question, mode, cache, key):
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/query",
-            json={"question": question, "mode": mode},
+            data=_json_dumps({"question": question, "mode": mode}),
+            headers={"Content-Type": "application/json"},
             timeout=30
         )
         if response.status_code == 200:
-            return response.json()
+            result = _json_loads(response.content)
+            # Only successes are cached — errors should retry for real
+            if "error" not in result:
+                cache[key] = result
+                if len(cache) > 128:
+                    cache.popitem(last=False)
+            return result
         else:
             return {"error": f"API Error: {response.status_code}"}
     except requests.exceptions.Timeout:
@@ -124,21 +234,60 @@ def query_documents(question: str, mode: str = "hybrid"):
     except Exception as e:
         return {"error": f"Connection error: {str(e)}"}
 
+def _stream_supported():
+    """Whether the API advertises the streaming query endpoint."""
+    if "stream_supported" not in st.session_state:
+        try:
+            probe = SESSION.options(f"{API_BASE}/query/stream", timeout=2)
+            st.session_state.stream_supported = probe.status_code < 400
+        except Exception:
+            st.session_state.stream_supported = False
+    return st.session_state.stream_supported
+
+def query_documents_stream(question: str, mode: str = "hybrid"):
+    """Yield answer tokens from the SSE streaming query endpoint."""
+    with SESSION.post(
+        f"{API_BASE}/query/stream",
+        json={"question": question, "mode": mode},
+        stream=True,
+        timeout=(5, 120)
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith(b"data: "):
+                token = _json_loads(line[6:]).get("token", "")
+                if token:
+                    yield token
+
 def upload_file(uploaded_file, force_reprocess=False):
     """Upload file via API."""
     try:
-        files = {"file": (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)}
-        data = {"force_reprocess": force_reprocess}
-        
-        response = requests.post(
-            f"{API_BASE}/upload",
-            files=files,
-            data=data,
-            timeout=60
-        )
+        if MultipartEncoder is not None:
+            # Stream straight from the UploadedFile object: peak memory
+            # is one chunk, not the whole file plus a multipart copy
+            uploaded_file.seek(0)
+            encoder = MultipartEncoder(fields={
+                "file": (uploaded_file.name, uploaded_file, uploaded_file.type),
+                "force_reprocess": str(force_reprocess),
+            })
+            response = SESSION.post(
+                f"{API_BASE}/upload",
+                data=encoder,
+                headers={"Content-Type": encoder.content_type},
+                timeout=(5, 300)
+            )
+        else:
+            files = {"file": (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)}
+            data = {"force_reprocess": force_reprocess}
+            response = SESSION.post(
+                f"{API_BASE}/upload",
+                files=files,
+                data=data,
+                timeout=60
+            )
         
         if response.status_code == 200:
-            return response.json()
+            return _json_loads(response.content)
         else:
             return {"error": f"Upload failed: {response.status_code}"}
     except Exception as e:
@@ -146,20 +295,14 @@ def upload_file(uploaded_file, force_reprocess=False):
 
 def get_documents():
     """Get list of processed documents."""
-    try:
-        response = requests.get(f"{API_BASE}/documents", timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        return []
-    except:
-        return []
+    return _fetch_status_and_docs()[1]
 
 def remove_document(doc_name: str):
     """Remove a document via API."""
     try:
-        response = requests.delete(f"{API_BASE}/documents/{doc_name}", timeout=10)
+        response = SESSION.delete(f"{API_BASE}/documents/{doc_name}", timeout=10)
         if response.status_code == 200:
-            return response.json()
+            return _json_loads(response.content)
         else:
             return {"error": f"Remove failed: {response.status_code}"}
     except Exception as e:
@@ -168,14 +311,525 @@ def remove_document(doc_name: str):
 def remove_all_documents():
     """Remove all documents via API."""
     try:
-        response = requests.delete(f"{API_BASE}/documents", timeout=30)
+        response = SESSION.delete(f"{API_BASE}/documents", timeout=30)
         if response.status_code == 200:
-            return response.json()
+            return _json_loads(response.content)
         else:
             return {"error": f"Remove all failed: {response.status_code}"}
     except Exception as e:
         return {"error": f"Remove all error: {str(e)}"}
 
+def _run_query(question: str, mode: str, query_id=None, expanded=True,
+               response=None, elapsed=None):
+    """Run one query and record the conversation pair in history.
+
+    With query_id given, only that query's assistant slot is replaced
+    (retry). With response/elapsed given, the API call is skipped and
+    the supplied result is recorded (streaming path).
+    """
+    retry = query_id is not None
+    if not retry:
+        st.session_state.query_counter += 1
+        query_id = st.session_state.query_counter
+        st.session_state.query_groups[query_id] = {
+            "user": {
+                "role": "user",
+                "content": question,
+                "query_id": query_id,
+                "timestamp": time.time(),
+                # Computed once here so the display loop is a plain read
+                "time_str": datetime.datetime.now().strftime("%H:%M:%S"),
+                "preview": question[:80] + "..." if len(question) > 80 else question,
+                "expanded": expanded,
+            },
+            "assistant": None,
+        }
+        # FIFO-evict past the rolling window (dicts keep insertion
+        # order) so per-rerun render cost stays flat over a long session
+        while len(st.session_state.query_groups) > 100:
+            st.session_state.query_groups.pop(next(iter(st.session_state.query_groups)))
+
+    if response is None:
+        start_time = time.time()
+        response = query_documents(question, mode)
+        elapsed = time.time() - start_time
+
+    error = "error" in response
+    if error:
+        content = ("**Retry Error:** " if retry else "**Error:** ") + response["error"]
+    else:
+        content = response.get("answer", "No response received")
+
+    st.session_state.query_groups[query_id]["assistant"] = {
+        "role": "assistant",
+        "content": content,
+        "query_id": query_id,
+        "mode": mode,
+        "time": f"{round(elapsed, 2)}s",
+        "timestamp": time.time(),
+        "error": error,
+    }
+
+@st.cache_resource
+def _pending_job():
+    """Shared state for the background process-pending call."""
+    return {"status": "idle"}
+
+def _bg_process_pending():
+    """Run the pending-files POST off the main thread.
+
+    Workers must not touch Streamlit widgets, so only the shared job
+    dict is updated; the poller fragment below renders it.
+    """
+    job = _pending_job()
+    try:
+        response = SESSION.post(f"{API_BASE}/process/pending", timeout=300)
+        job["status"] = "done" if response.ok else "error"
+    except Exception:
+        job["status"] = "error"
+
+@st.fragment(run_every="2s")
+def _pending_status():
+    """Poll the background job every couple of seconds while it runs."""
+    job = _pending_job()
+    if job["status"] == "running":
+        st.info("⏳ Processing pending files in the background — other tabs stay usable...")
+    elif job["status"] == "done":
+        st.success("✅ Pending files processed")
+        job["status"] = "idle"
+        st.cache_data.clear()
+    elif job["status"] == "error":
+        st.error("❌ Processing pending files failed")
+        job["status"] = "idle"
+
+# Each tab body is an isolated fragment: a widget event inside one
+# fragment reruns only that fragment, so e.g. a chat retry no longer
+# re-fetches documents and status for tabs that aren't even visible.
+@st.fragment
+def _chat_tab():
+    st.header("💬 Chat with Your Documents")
+    
+    # Query Mode Selection
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        query_mode = st.selectbox(
+            "Query Mode:",
+            ["hybrid", "local", "global"],
+            help="Hybrid: Best overall results | Local: Document-specific | Global: Knowledge graph"
+        )
+    with col2:
+        clear_chat = st.button("🧹 Clear Chat")
+        if clear_chat:
+            st.session_state.query_groups = {}
+            st.session_state.query_counter = 0
+            st.rerun()
+    with col3:
+        if st.session_state.query_groups:
+            expand_all = st.button("📖 Expand All")
+            if expand_all:
+                # Set all queries to expanded
+                for pair in st.session_state.query_groups.values():
+                    if pair["user"]:
+                        pair["user"]["expanded"] = True
+                st.rerun()
+    
+    # Chat input (at the top for better UX)
+    if prompt := st.chat_input("Ask anything about your documents..."):
+        # Stream tokens as they arrive when the server supports it,
+        # so the user reads along with the generation instead of
+        # staring at a spinner
+        if _stream_supported():
+            try:
+                start_time = time.time()
+                with st.chat_message("assistant"):
+                    answer = st.write_stream(query_documents_stream(prompt, query_mode))
+                _run_query(prompt, query_mode,
+                           response={"answer": answer},
+                           elapsed=time.time() - start_time)
+            except Exception:
+                _run_query(prompt, query_mode)
+        else:
+            with st.spinner("Thinking..."):
+                _run_query(prompt, query_mode)
+        st.rerun()
+    
+    # Display chat messages (most recent first, collapsible).
+    # Insertion order is query order, so one reversed pass replaces
+    # the old regroup-and-sort on every rerun.
+    if st.session_state.query_groups:
+        st.markdown("### 📚 Conversation History")
+        if len(st.session_state.query_groups) >= 100:
+            st.caption("Showing the last 100 queries — clear chat to reset")
+
+        for query_id, pair in reversed(list(st.session_state.query_groups.items())):
+            user_msg = pair["user"]
+            assistant_msg = pair["assistant"]
+            
+            if user_msg:
+                # Preview and timestamp were computed at insert time
+                query_preview = user_msg["preview"]
+                time_str = user_msg["time_str"]
+
+                # Historical queries are collapsed by default (only most recent is expanded)
+                is_expanded = (query_id == st.session_state.query_counter)
+                
+                # Status indicator
+                if assistant_msg:
+                    status = "❌" if assistant_msg.get("error", False) else "✅"
+                    response_time = assistant_msg.get("time", "")
+                    mode = assistant_msg.get("mode", "")
+                else:
+                    status = "⏳"
+                    response_time = ""
+                    mode = ""
+                
+                # Collapsible query section with modern styling
+                with st.expander(
+                    f"{status} **Query #{query_id}** [{time_str}] {mode} {response_time} | {query_preview}",
+                    expanded=is_expanded
+                ):
+                    # User question with modern styling
+                    st.markdown("**🤔 Question:**")
+                    st.markdown(f"> {user_msg['content']}")
+                    
+                    # Assistant response
+                    if assistant_msg:
+                        st.markdown("**🤖 Answer:**")
+                        if assistant_msg.get("error", False):
+                            st.error(assistant_msg["content"])
+                        else:
+                            # Render markdown properly for RAG responses
+                            st.markdown(assistant_msg["content"])
+                        
+                        # Metadata with modern layout
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.caption(f"🎯 Mode: {assistant_msg.get('mode', 'Unknown')}")
+                        with col2:
+                            st.caption(f"⏱️ Time: {assistant_msg.get('time', 'Unknown')}")
+                        with col3:
+                            # Add copy button for the response
+                            if st.button("📋 Copy Response", key=f"copy_{query_id}", help="Copy response to clipboard"):
+                                st.code(assistant_msg["content"])
+                    else:
+                        st.warning("⏳ Processing...")
+                    
+                    # One lazily-rendered popover per query instead of a
+                    # four-button grid: idle per-query widget cost drops
+                    # to the popover handle; the radio and Apply button
+                    # only materialize when the menu is opened
+                    with st.popover("⋮ Actions"):
+                        choice = st.radio(
+                            "Action:",
+                            ["Retry", "Delete", "Share", "Follow-up"],
+                            key=f"act_{query_id}",
+                            label_visibility="collapsed"
+                        )
+                        if st.button("Apply", key=f"apply_{query_id}"):
+                            if choice == "Retry":
+                                with st.spinner("Retrying..."):
+                                    _run_query(user_msg["content"], query_mode, query_id=query_id)
+                                st.rerun()
+                            elif choice == "Delete":
+                                # O(1) removal of the whole pair
+                                del st.session_state.query_groups[query_id]
+                                st.rerun()
+                            elif choice == "Share":
+                                share_text = f"**Question:** {user_msg['content']}\n\n**Answer:** {assistant_msg.get('content', 'No response') if assistant_msg else 'Processing...'}"
+                                st.text_area("Share this conversation:", value=share_text, height=150, key=f"share_text_{query_id}")
+                            elif choice == "Follow-up" and assistant_msg and not assistant_msg.get("error", False):
+                                followup_prompt = f"Based on your previous answer about '{user_msg['content'][:50]}...', can you tell me more about"
+                                st.text_input("Follow-up question:", value=followup_prompt, key=f"followup_input_{query_id}")
+    
+    else:
+        # Welcome section with modern design
+        st.markdown("""
+        <div class="welcome-section">
+            <h2>👋 Welcome to RAG-Anything!</h2>
+            <p>Start by asking a question about your processed documents, or try one of the examples below.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Show some example queries with working buttons
+        st.markdown("### 💡 Example Questions")
+        
+        example_queries = [
+            "What documents have been processed?",
+            "Summarize the main findings from my documents",
+            "What financial information is available?",
+            "List all the entities mentioned in the documents",
+            "What are the key dates and amounts mentioned?",
+            "Can you extract transaction details from my bank statement?",
+            "What tables or structured data are in my documents?",
+            "Show me a summary of all processed content"
+        ]
+        
+        # Create a grid layout for example questions
+        cols = st.columns(2)
+        for i, example in enumerate(example_queries):
+            with cols[i % 2]:
+                # Use a unique key and direct query execution
+                if st.button(f"💭 {example}", key=f"example_query_{i}", use_container_width=True):
+                    with st.spinner("Thinking..."):
+                        _run_query(example, query_mode)
+                    st.rerun()
+        
+        # Run every example concurrently: independent queries finish
+        # in roughly max(latency) instead of sum(latency). The pooled
+        # SESSION is thread-safe for separate requests.
+        if st.button("▶️ Run All Examples", use_container_width=True):
+            def _timed(question):
+                query_start = time.time()
+                result = query_documents(question, query_mode)
+                return result, time.time() - query_start
+
+            with st.spinner("Running all examples..."):
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    futures = {executor.submit(_timed, q): q for q in example_queries}
+                    results = {futures[f]: f.result() for f in as_completed(futures)}
+
+            # Append in grid order so history reads naturally
+            for example in example_queries:
+                response, elapsed = results[example]
+                _run_query(example, query_mode, expanded=False,
+                           response=response, elapsed=elapsed)
+            st.rerun()
+
+        # Add tips section
+        st.markdown("### 🎯 Tips for Better Results")
+        tips_col1, tips_col2 = st.columns(2)
+        
+        with tips_col1:
+            st.info("""
+            **💡 Query Tips:**
+            - Be specific in your questions
+            - Use **hybrid mode** for best results
+            - Ask about specific documents or topics
+            - Try different phrasings if you don't get good results
+            """)
+        
+        with tips_col2:
+            st.info("""
+            **📊 Query Modes:**
+            - **Hybrid**: Best overall results (recommended)
+            - **Local**: Focus on specific documents
+            - **Global**: Use knowledge graph relationships
+            """)
+        
+        # System stats in welcome
+        if st.checkbox("📊 Show System Stats", value=False):
+            status = get_system_status()
+            if status:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("📄 Documents", len(status.get("documents", [])))
+                with col2:
+                    st.metric("💾 Processed", status.get("processed_files_count", 0))
+                with col3:
+                    st.metric("⏳ Pending", status.get("pending_files_count", 0))
+
+_STATUS_ICONS = (("💾", "in_cache"), ("📁", "in_processed_dir"),
+                 ("🧠", "in_knowledge_base"))
+
+@st.cache_data(show_spinner=False,
+               hash_funcs={list: lambda L: tuple(
+                   (d["name"], d.get("process_date")) for d in L)})
+def _docs_soa(documents):
+    """Precompute the document table as parallel columns.
+
+    Derives each row's display strings (status icons included) once per
+    distinct document list instead of re-branching per row per rerun;
+    the render loop below is reduced to flat index lookups.
+    """
+    return {
+        "names": [d["name"] for d in documents],
+        "statuses": ["".join(icon for icon, key in _STATUS_ICONS
+                             if d.get(key)) for d in documents],
+        "sizes": [d.get("file_size", "—") for d in documents],
+        "dates": [d.get("process_date", "—") for d in documents],
+    }
+
+@st.fragment
+def _documents_tab():
+    st.header("📋 Document Management")
+    
+    # Refresh button
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        if st.button("🔄 Refresh Document List"):
+            st.cache_data.clear()
+            st.rerun()
+    with col2:
+        if st.button("🗑️ Remove All Documents", type="secondary"):
+            if st.session_state.get("confirm_remove_all", False):
+                result = remove_all_documents()
+                if "error" in result:
+                    st.error(f"❌ {result['error']}")
+                else:
+                    st.success("✅ All documents removed")
+                    st.session_state.confirm_remove_all = False
+                    st.cache_data.clear()
+                    st.rerun()
+            else:
+                st.session_state.confirm_remove_all = True
+                st.warning("⚠️ Click again to confirm removal of ALL documents")
+    
+    # Get documents
+    documents = get_documents()
+    
+    if not documents:
+        st.info("📄 No documents processed yet. Upload some files to get started!")
+    else:
+        st.write(f"**Total Documents:** {len(documents)}")
+
+        # Display documents with remove buttons
+        soa = _docs_soa(documents)
+        for i, name in enumerate(soa["names"]):
+            with st.container():
+                col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 1, 1])
+                
+                with col1:
+                    st.write(f"**{name}**")
+                with col2:
+                    st.write(soa["statuses"][i])
+                with col3:
+                    st.write(soa["sizes"][i])
+                with col4:
+                    st.write(soa["dates"][i])
+                with col5:
+                    if st.button("🗑️", key=f"remove_{i}", help=f"Remove {name}"):
+                        result = remove_document(name)
+                        if "error" in result:
+                            st.error(f"❌ {result['error']}")
+                        else:
+                            st.success(f"✅ Removed {name}")
+                            st.cache_data.clear()
+                            st.rerun()
+                
+                st.divider()
+        
+        # Legend
+        with st.expander("🔍 Status Legend"):
+            st.write("💾 = In processing cache")
+            st.write("📁 = In processed files directory")
+            st.write("🧠 = In knowledge base")
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _compute_doc_chart(docs_tuple):
+    """Build the storage-distribution chart frame for one document set.
+
+    Takes a tuple of (name, in_cache, in_processed_dir,
+    in_knowledge_base) rows so st.cache_data can hash the input; the
+    counting loop and DataFrame construction then run once per distinct
+    document set instead of on every rerun.
+    """
+    # Pack the three flags into one uint8 per document and sum the bits
+    # in C: ~1 byte/doc of working memory versus materializing a wide
+    # object-dtype DataFrame just to reduce three boolean columns
+    codes = np.fromiter(
+        ((bool(in_cache) << 0) | (bool(in_proc) << 1) | (bool(in_kb) << 2)
+         for _name, in_cache, in_proc, in_kb in docs_tuple),
+        dtype=np.uint8, count=len(docs_tuple))
+    counts = [int(((codes >> b) & 1).sum()) for b in range(3)]
+    # Arrow-backed dtypes: Streamlit ships frames over an Arrow wire
+    # format, so handing it Arrow columns skips the NumPy-object →
+    # Arrow conversion it would otherwise do per render (pyarrow is a
+    # hard Streamlit dependency, so the dtypes are always available)
+    chart = pd.DataFrame({
+        "Storage Type": pd.array(["Cache", "Processed", "Knowledge Base"],
+                                 dtype="string[pyarrow]"),
+        "Count": pd.array(counts, dtype="int32[pyarrow]"),
+    })
+    return chart.set_index("Storage Type")
+
+@st.fragment
+def _analytics_tab():
+    st.header("📊 System Analytics")
+    
+    # Client-observed query latency — the surface that shows whether
+    # the keep-alive / caching / streaming work actually lands
+    records = list(_latency_log())
+    if records:
+        st.subheader("⏱️ Query Latency (this session)")
+        durations = np.array([r["t1"] - r["t0"] for r in records])
+        span = max(records[-1]["t1"] - records[0]["t0"], 1e-9)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Queries", len(records))
+        with col2:
+            st.metric("p50 latency", f"{np.percentile(durations, 50):.2f}s")
+        with col3:
+            st.metric("p95 latency", f"{np.percentile(durations, 95):.2f}s")
+        with col4:
+            st.metric("Throughput", f"{len(records) / span:.2f} q/s")
+
+    status = get_system_status()
+    if status:
+        # Metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                "Total Documents",
+                len(status.get("documents", [])),
+                help="Number of processed documents"
+            )
+        
+        with col2:
+            st.metric(
+                "Cache Entries",
+                status.get("processed_files_count", 0),
+                help="Documents in processing cache"
+            )
+        
+        with col3:
+            st.metric(
+                "Pending Files",
+                status.get("pending_files_count", 0),
+                help="Files waiting to be processed"
+            )
+        
+        with col4:
+            kb_active = "✅ Active" if status.get("lightrag_storage_exists") else "❌ Inactive"
+            st.metric(
+                "Knowledge Base",
+                kb_active,
+                help="LightRAG knowledge graph status"
+            )
+        
+        # Storage Information
+        st.subheader("💾 Storage Directories")
+        storage_dirs = status.get("storage_directories", {})
+        for name, path in storage_dirs.items():
+            st.text(f"{name}: {path}")
+        
+        # Document Details
+        if status.get("documents"):
+            st.subheader("📄 Document Details")
+            
+            # Fingerprint first: st.cache_data still hashes its full
+            # argument every rerun, which is O(N) over the docs tuple.
+            # Three integer sums are enough to detect a change, so the
+            # tuple build + hash only happen when the set really moved.
+            docs = status["documents"]
+            fp = (len(docs),
+                  sum(bool(d.get("in_cache")) for d in docs),
+                  sum(bool(d.get("in_processed_dir")) for d in docs),
+                  sum(bool(d.get("in_knowledge_base")) for d in docs))
+            if st.session_state.get("_chart_fp") != fp:
+                docs_tuple = tuple(
+                    (d["name"], d.get("in_cache", False),
+                     d.get("in_processed_dir", False),
+                     d.get("in_knowledge_base", False))
+                    for d in docs
+                )
+                st.session_state["_chart_df"] = _compute_doc_chart(docs_tuple)
+                st.session_state["_chart_fp"] = fp
+            st.bar_chart(st.session_state["_chart_df"])
+    
+    else:
+        st.error("❌ Could not load system analytics")
+
 # Main App
 def main():
     # Header
@@ -211,10 +865,15 @@ def main():
         # Quick Actions
         st.header("⚡ Quick Actions")
         if st.button("🔄 Refresh Status"):
+            st.cache_data.clear()
             st.rerun()
         
+        if st.button("🧽 Clear Response Cache"):
+            _response_cache().clear()
+            st.rerun()
+
         if st.button("🗑️ Clear Chat History"):
-            st.session_state.messages = []
+            st.session_state.query_groups = {}
             st.session_state.query_counter = 0
             st.rerun()
 
@@ -223,317 +882,8 @@ def main():
     
     # Tab 1: Chat Interface
     with tab1:
-        st.header("💬 Chat with Your Documents")
-        
-        # Query Mode Selection
-        col1, col2, col3 = st.columns([2, 1, 1])
-        with col1:
-            query_mode = st.selectbox(
-                "Query Mode:",
-                ["hybrid", "local", "global"],
-                help="Hybrid: Best overall results | Local: Document-specific | Global: Knowledge graph"
-            )
-        with col2:
-            clear_chat = st.button("🧹 Clear Chat")
-            if clear_chat:
-                st.session_state.messages = []
-                st.session_state.query_counter = 0
-                st.rerun()
-        with col3:
-            if st.session_state.messages:
-                expand_all = st.button("📖 Expand All")
-                if expand_all:
-                    # Set all queries to expanded
-                    for msg in st.session_state.messages:
-                        if msg["role"] == "user":
-                            msg["expanded"] = True
-                    st.rerun()
-        
-        # Chat input (at the top for better UX)
-        if prompt := st.chat_input("Ask anything about your documents..."):
-            # Increment query counter
-            st.session_state.query_counter += 1
-            
-            # Add user message with metadata
-            user_message = {
-                "role": "user", 
-                "content": prompt,
-                "query_id": st.session_state.query_counter,
-                "timestamp": time.time(),
-                "expanded": True  # New queries start expanded
-            }
-            
-            # Insert at the beginning (most recent first)
-            st.session_state.messages.insert(0, user_message)
-            
-            # Get AI response
-            with st.spinner("Thinking..."):
-                start_time = time.time()
-                response = query_documents(prompt, query_mode)
-                end_time = time.time()
-            
-            if "error" in response:
-                assistant_message = {
-                    "role": "assistant", 
-                    "content": f"**Error:** {response['error']}",
-                    "query_id": st.session_state.query_counter,
-                    "mode": query_mode,
-                    "time": f"{round(end_time - start_time, 2)}s",
-                    "timestamp": time.time(),
-                    "error": True
-                }
-            else:
-                # Store the successful response
-                answer = response.get("answer", "No response received")
-                assistant_message = {
-                    "role": "assistant",
-                    "content": answer,
-                    "query_id": st.session_state.query_counter,
-                    "mode": query_mode,
-                    "time": f"{round(end_time - start_time, 2)}s",
-                    "timestamp": time.time(),
-                    "error": False
-                }
-            
-            # Insert assistant response after user message
-            st.session_state.messages.insert(1, assistant_message)
-            st.rerun()
-        
-        # Display chat messages (most recent first, collapsible)
-        if st.session_state.messages:
-            st.markdown("### 📚 Conversation History")
-            
-            # Group messages by query_id and display in reverse order
-            query_groups = {}
-            for message in st.session_state.messages:
-                query_id = message.get("query_id", 0)
-                if query_id not in query_groups:
-                    query_groups[query_id] = {"user": None, "assistant": None}
-                query_groups[query_id][message["role"]] = message
-            
-            # Sort by query_id descending (most recent first)
-            sorted_queries = sorted(query_groups.items(), key=lambda x: x[0], reverse=True)
-            
-            for query_id, messages in sorted_queries:
-                user_msg = messages.get("user")
-                assistant_msg = messages.get("assistant")
-                
-                if user_msg:
-                    # Create collapsible section for each query
-                    query_preview = user_msg["content"][:80] + "..." if len(user_msg["content"]) > 80 else user_msg["content"]
-                    
-                    # Historical queries are collapsed by default (only most recent is expanded)
-                    is_expanded = (query_id == st.session_state.query_counter)
-                    
-                    # Create timestamp
-                    import datetime
-                    timestamp = datetime.datetime.fromtimestamp(user_msg.get("timestamp", time.time()))
-                    time_str = timestamp.strftime("%H:%M:%S")
-                    
-                    # Status indicator
-                    if assistant_msg:
-                        status = "❌" if assistant_msg.get("error", False) else "✅"
-                        response_time = assistant_msg.get("time", "")
-                        mode = assistant_msg.get("mode", "")
-                    else:
-                        status = "⏳"
-                        response_time = ""
-                        mode = ""
-                    
-                    # Collapsible query section with modern styling
-                    with st.expander(
-                        f"{status} **Query #{query_id}** [{time_str}] {mode} {response_time} | {query_preview}",
-                        expanded=is_expanded
-                    ):
-                        # User question with modern styling
-                        st.markdown("**🤔 Question:**")
-                        st.markdown(f"> {user_msg['content']}")
-                        
-                        # Assistant response
-                        if assistant_msg:
-                            st.markdown("**🤖 Answer:**")
-                            if assistant_msg.get("error", False):
-                                st.error(assistant_msg["content"])
-                            else:
-                                # Render markdown properly for RAG responses
-                                st.markdown(assistant_msg["content"])
-                            
-                            # Metadata with modern layout
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.caption(f"🎯 Mode: {assistant_msg.get('mode', 'Unknown')}")
-                            with col2:
-                                st.caption(f"⏱️ Time: {assistant_msg.get('time', 'Unknown')}")
-                            with col3:
-                                # Add copy button for the response
-                                if st.button("📋 Copy Response", key=f"copy_{query_id}", help="Copy response to clipboard"):
-                                    st.code(assistant_msg["content"])
-                        else:
-                            st.warning("⏳ Processing...")
-                        
-                        # Action buttons with modern layout
-                        col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
-                        with col1:
-                            if st.button("🔄 Retry", key=f"retry_{query_id}", help="Retry this query"):
-                                # Re-run the same query
-                                with st.spinner("Retrying..."):
-                                    start_time = time.time()
-                                    response = query_documents(user_msg["content"], query_mode)
-                                    end_time = time.time()
-                                
-                                if "error" in response:
-                                    retry_message = {
-                                        "role": "assistant", 
-                                        "content": f"**Retry Error:** {response['error']}",
-                                        "query_id": query_id,
-                                        "mode": query_mode,
-                                        "time": f"{round(end_time - start_time, 2)}s",
-                                        "timestamp": time.time(),
-                                        "error": True
-                                    }
-                                else:
-                                    retry_message = {
-                                        "role": "assistant",
-                                        "content": response.get("answer", "No response received"),
-                                        "query_id": query_id,
-                                        "mode": query_mode,
-                                        "time": f"{round(end_time - start_time, 2)}s",
-                                        "timestamp": time.time(),
-                                        "error": False
-                                    }
-                                
-                                # Update the assistant message
-                                for i, msg in enumerate(st.session_state.messages):
-                                    if msg.get("query_id") == query_id and msg["role"] == "assistant":
-                                        st.session_state.messages[i] = retry_message
-                                        break
-                                st.rerun()
-                        
-                        with col2:
-                            if st.button("🗑️ Delete", key=f"delete_{query_id}", help="Delete this query"):
-                                # Remove both user and assistant messages for this query
-                                st.session_state.messages = [
-                                    msg for msg in st.session_state.messages 
-                                    if msg.get("query_id") != query_id
-                                ]
-                                st.rerun()
-                        
-                        with col3:
-                            if st.button("📤 Share", key=f"share_{query_id}", help="Share this query"):
-                                share_text = f"**Question:** {user_msg['content']}\n\n**Answer:** {assistant_msg.get('content', 'No response') if assistant_msg else 'Processing...'}"
-                                st.text_area("Share this conversation:", value=share_text, height=150, key=f"share_text_{query_id}")
-                        
-                        with col4:
-                            if assistant_msg and not assistant_msg.get("error", False):
-                                if st.button("🔗 Follow-up", key=f"followup_{query_id}", help="Ask a follow-up question"):
-                                    # Pre-populate with a follow-up prompt
-                                    followup_prompt = f"Based on your previous answer about '{user_msg['content'][:50]}...', can you tell me more about"
-                                    st.text_input("Follow-up question:", value=followup_prompt, key=f"followup_input_{query_id}")
-        
-        else:
-            # Welcome section with modern design
-            st.markdown("""
-            <div class="welcome-section">
-                <h2>👋 Welcome to RAG-Anything!</h2>
-                <p>Start by asking a question about your processed documents, or try one of the examples below.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Show some example queries with working buttons
-            st.markdown("### 💡 Example Questions")
-            
-            example_queries = [
-                "What documents have been processed?",
-                "Summarize the main findings from my documents",
-                "What financial information is available?",
-                "List all the entities mentioned in the documents",
-                "What are the key dates and amounts mentioned?",
-                "Can you extract transaction details from my bank statement?",
-                "What tables or structured data are in my documents?",
-                "Show me a summary of all processed content"
-            ]
-            
-            # Create a grid layout for example questions
-            cols = st.columns(2)
-            for i, example in enumerate(example_queries):
-                with cols[i % 2]:
-                    # Use a unique key and direct query execution
-                    if st.button(f"💭 {example}", key=f"example_query_{i}", use_container_width=True):
-                        # Directly execute the example query
-                        st.session_state.query_counter += 1
-                        
-                        # Add user message
-                        user_message = {
-                            "role": "user", 
-                            "content": example,
-                            "query_id": st.session_state.query_counter,
-                            "timestamp": time.time(),
-                            "expanded": True
-                        }
-                        st.session_state.messages.insert(0, user_message)
-                        
-                        # Get AI response
-                        start_time = time.time()
-                        response = query_documents(example, query_mode)
-                        end_time = time.time()
-                        
-                        if "error" in response:
-                            assistant_message = {
-                                "role": "assistant", 
-                                "content": f"**Error:** {response['error']}",
-                                "query_id": st.session_state.query_counter,
-                                "mode": query_mode,
-                                "time": f"{round(end_time - start_time, 2)}s",
-                                "timestamp": time.time(),
-                                "error": True
-                            }
-                        else:
-                            assistant_message = {
-                                "role": "assistant",
-                                "content": response.get("answer", "No response received"),
-                                "query_id": st.session_state.query_counter,
-                                "mode": query_mode,
-                                "time": f"{round(end_time - start_time, 2)}s",
-                                "timestamp": time.time(),
-                                "error": False
-                            }
-                        
-                        st.session_state.messages.insert(1, assistant_message)
-                        st.rerun()
-            
-            # Add tips section
-            st.markdown("### 🎯 Tips for Better Results")
-            tips_col1, tips_col2 = st.columns(2)
-            
-            with tips_col1:
-                st.info("""
-                **💡 Query Tips:**
-                - Be specific in your questions
-                - Use **hybrid mode** for best results
-                - Ask about specific documents or topics
-                - Try different phrasings if you don't get good results
-                """)
-            
-            with tips_col2:
-                st.info("""
-                **📊 Query Modes:**
-                - **Hybrid**: Best overall results (recommended)
-                - **Local**: Focus on specific documents
-                - **Global**: Use knowledge graph relationships
-                """)
-            
-            # System stats in welcome
-            if st.checkbox("📊 Show System Stats", value=False):
-                status = get_system_status()
-                if status:
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("📄 Documents", len(status.get("documents", [])))
-                    with col2:
-                        st.metric("💾 Processed", status.get("processed_files_count", 0))
-                    with col3:
-                        st.metric("⏳ Pending", status.get("pending_files_count", 0))
-    
+        _chat_tab()
+
     # Tab 2: Upload Interface
     with tab2:
         st.header("📤 Upload & Process Documents")
@@ -561,182 +911,49 @@ def main():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                for i, file in enumerate(uploaded_files):
-                    status_text.text(f"Uploading {file.name}...")
-                    result = upload_file(file, force_reprocess)
-                    
-                    if "error" in result:
-                        st.error(f"❌ {file.name}: {result['error']}")
-                    else:
-                        st.success(f"✅ {file.name}: {result.get('message', 'Uploaded successfully')}")
-                    
-                    progress_bar.progress((i + 1) / len(uploaded_files))
+                # Upload concurrently: N files finish in roughly the
+                # time of the slowest one instead of the sum. Workers
+                # only return results; all rendering stays on the main
+                # thread where Streamlit requires it.
+                status_text.text(f"Uploading {len(uploaded_files)} file(s)...")
+                done = 0
+                with ThreadPoolExecutor(max_workers=min(4, len(uploaded_files))) as executor:
+                    futures = {
+                        executor.submit(upload_file, f, force_reprocess): f
+                        for f in uploaded_files
+                    }
+                    for future in as_completed(futures):
+                        file = futures[future]
+                        result = future.result()
+                        if "error" in result:
+                            st.error(f"❌ {file.name}: {result['error']}")
+                        else:
+                            st.success(f"✅ {file.name}: {result.get('message', 'Uploaded successfully')}")
+                        done += 1
+                        progress_bar.progress(done / len(uploaded_files))
                 
+                st.cache_data.clear()  # New files change /status and /documents
                 status_text.text("Upload complete!")
                 time.sleep(1)
                 status_text.empty()
                 progress_bar.empty()
         
-        if process_pending:
-            with st.spinner("Processing pending files..."):
-                try:
-                    response = requests.post(f"{API_BASE}/process/pending", timeout=60)
-                    if response.status_code == 200:
-                        st.success("✅ Processing started for pending files")
-                    else:
-                        st.error("❌ Failed to start processing")
-                except Exception as e:
-                    st.error(f"❌ Error: {e}")
+        if process_pending and _pending_job()["status"] != "running":
+            # Fire-and-forget: the POST can take minutes and used to
+            # freeze every widget behind a spinner for its duration
+            _pending_job()["status"] = "running"
+            threading.Thread(target=_bg_process_pending, daemon=True).start()
+
+        if _pending_job()["status"] != "idle":
+            _pending_status()
 
     # Tab 3: Document Management
     with tab3:
-        st.header("📋 Document Management")
-        
-        # Refresh button
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            if st.button("🔄 Refresh Document List"):
-                st.rerun()
-        with col2:
-            if st.button("🗑️ Remove All Documents", type="secondary"):
-                if st.session_state.get("confirm_remove_all", False):
-                    result = remove_all_documents()
-                    if "error" in result:
-                        st.error(f"❌ {result['error']}")
-                    else:
-                        st.success("✅ All documents removed")
-                        st.session_state.confirm_remove_all = False
-                        st.rerun()
-                else:
-                    st.session_state.confirm_remove_all = True
-                    st.warning("⚠️ Click again to confirm removal of ALL documents")
-        
-        # Get documents
-        documents = get_documents()
-        
-        if not documents:
-            st.info("📄 No documents processed yet. Upload some files to get started!")
-        else:
-            st.write(f"**Total Documents:** {len(documents)}")
-            
-            # Create DataFrame for better display
-            doc_data = []
-            for doc in documents:
-                status_icons = ""
-                if doc.get("in_cache", False):
-                    status_icons += "💾"
-                if doc.get("in_processed_dir", False):
-                    status_icons += "📁"
-                if doc.get("in_knowledge_base", False):
-                    status_icons += "🧠"
-                
-                doc_data.append({
-                    "Document": doc["name"],
-                    "Status": status_icons,
-                    "Size": doc.get("file_size", "Unknown"),
-                    "Processed": doc.get("process_date", "Unknown")
-                })
-            
-            df = pd.DataFrame(doc_data)
-            
-            # Display documents with remove buttons
-            for i, doc in enumerate(documents):
-                with st.container():
-                    col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 1, 1])
-                    
-                    with col1:
-                        st.write(f"**{doc['name']}**")
-                    with col2:
-                        status = ""
-                        if doc.get("in_cache"): status += "💾"
-                        if doc.get("in_processed_dir"): status += "📁"
-                        if doc.get("in_knowledge_base"): status += "🧠"
-                        st.write(status)
-                    with col3:
-                        st.write(doc.get("file_size", "—"))
-                    with col4:
-                        st.write(doc.get("process_date", "—"))
-                    with col5:
-                        if st.button("🗑️", key=f"remove_{i}", help=f"Remove {doc['name']}"):
-                            result = remove_document(doc["name"])
-                            if "error" in result:
-                                st.error(f"❌ {result['error']}")
-                            else:
-                                st.success(f"✅ Removed {doc['name']}")
-                                st.rerun()
-                    
-                    st.divider()
-            
-            # Legend
-            with st.expander("🔍 Status Legend"):
-                st.write("💾 = In processing cache")
-                st.write("📁 = In processed files directory")
-                st.write("🧠 = In knowledge base")
+        _documents_tab()
 
     # Tab 4: Analytics
     with tab4:
-        st.header("📊 System Analytics")
-        
-        status = get_system_status()
-        if status:
-            # Metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric(
-                    "Total Documents",
-                    len(status.get("documents", [])),
-                    help="Number of processed documents"
-                )
-            
-            with col2:
-                st.metric(
-                    "Cache Entries",
-                    status.get("processed_files_count", 0),
-                    help="Documents in processing cache"
-                )
-            
-            with col3:
-                st.metric(
-                    "Pending Files",
-                    status.get("pending_files_count", 0),
-                    help="Files waiting to be processed"
-                )
-            
-            with col4:
-                kb_active = "✅ Active" if status.get("lightrag_storage_exists") else "❌ Inactive"
-                st.metric(
-                    "Knowledge Base",
-                    kb_active,
-                    help="LightRAG knowledge graph status"
-                )
-            
-            # Storage Information
-            st.subheader("💾 Storage Directories")
-            storage_dirs = status.get("storage_directories", {})
-            for name, path in storage_dirs.items():
-                st.text(f"{name}: {path}")
-            
-            # Document Details
-            if status.get("documents"):
-                st.subheader("📄 Document Details")
-                
-                # Create charts
-                doc_status_counts = {"Cache": 0, "Processed": 0, "Knowledge Base": 0}
-                for doc in status["documents"]:
-                    if doc.get("in_cache"): doc_status_counts["Cache"] += 1
-                    if doc.get("in_processed_dir"): doc_status_counts["Processed"] += 1
-                    if doc.get("in_knowledge_base"): doc_status_counts["Knowledge Base"] += 1
-                
-                # Display as chart
-                chart_data = pd.DataFrame(
-                    list(doc_status_counts.items()),
-                    columns=["Storage Type", "Count"]
-                )
-                st.bar_chart(chart_data.set_index("Storage Type"))
-        
-        else:
-            st.error("❌ Could not load system analytics")
+        _analytics_tab()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Optional arq/Redis task queue for document processing.
+
+FastAPI BackgroundTasks run inside the API worker process, so a long
+PDF parse monopolizes that worker's event loop. When REDIS_URL is set
+and arq is installed, processing jobs are enqueued to external worker
+processes instead and the API stays responsive.
+
+Run a worker with:
+    arq task_queue.WorkerSettings
+"""
+import logging
+
+try:
+    from arq import create_pool
+    from arq.connections import RedisSettings
+    ARQ_AVAILABLE = True
+except ImportError:
+    ARQ_AVAILABLE = False
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+async def process_document_task(ctx, file_path: str, force_reprocess: bool = False):
+    """arq task: process one document with a worker-local QueryInterface."""
+    from query_interface import QueryInterface
+
+    # Reuse one initialized interface per worker process
+    interface = ctx.get('query_interface')
+    if interface is None:
+        interface = QueryInterface()
+        await interface.initialize(use_existing=True)
+        ctx['query_interface'] = interface
+
+    success = await interface.add_document(file_path, force_reprocess)
+    return {"file_path": file_path, "success": success}
+
+async def get_task_pool():
+    """Create an arq Redis pool, or None when the queue is not configured."""
+    if not ARQ_AVAILABLE or not Config.REDIS_URL:
+        return None
+
+    try:
+        pool = await create_pool(RedisSettings.from_dsn(Config.REDIS_URL))
+        logger.info(f"Connected to task queue at {Config.REDIS_URL}")
+        return pool
+    except Exception as e:
+        logger.warning(f"Could not connect to Redis task queue: {e}")
+        return None
+
+if ARQ_AVAILABLE:
+    class WorkerSettings:
+        """arq worker configuration."""
+        functions = [process_document_task]
+        redis_settings = RedisSettings.from_dsn(Config.REDIS_URL or "redis://localhost:6379")